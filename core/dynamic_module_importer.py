@@ -13,6 +13,7 @@ import sys
 import logging
 import time
 import json
+import contextvars
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Union, TYPE_CHECKING
@@ -39,6 +40,9 @@ except ImportError:
 if TYPE_CHECKING:
     from core.performance_metrics import PerformanceMetrics
 
+# 当前操作的correlation_id：上下文局部存储，线程/协程间互不干扰，无需实例级状态
+_CORRELATION: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("correlation_id", default=None)
+
 
 class DynamicModuleImporter:
 	"""
@@ -102,8 +106,11 @@ class DynamicModuleImporter:
 			'fallback_usage': 0
 		}
 
-		# 关联的当前correlation_id（由UI或调用方注入）
-		self._correlation_id: Optional[str] = None
+		# 错误统计缓存：(error_handler.version, stats_dict)，版本未变时复用
+		self._error_stats_cache: Optional[tuple] = None
+
+		# 最近一次set_correlation_id返回的上下文令牌，供reset_correlation_id还原
+		self._cv_token: Optional[contextvars.Token] = None
 		self.performance_metrics = performance_metrics
 		self.snapshot_manager = snapshot_manager
 		if self.performance_metrics is None:
@@ -935,8 +942,19 @@ class DynamicModuleImporter:
 		# 获取统一缓存管理器统计信息
 		unified_stats = self.cache_manager.get_stats()
 		
-		# 获取错误统计信息
-		error_stats = self.error_handler.get_error_stats()
+		# 获取错误统计信息（错误处理器版本号未变化时复用上次序列化结果）；
+		# 返回副本避免调用方修改缓存，错误率随时间变化，每次重新计算
+		version = getattr(self.error_handler, 'version', None)
+		cached = self._error_stats_cache
+		if version is not None and cached is not None and cached[0] == version:
+			error_stats_dict = {k: dict(v) if isinstance(v, dict) else v for k, v in cached[1].items()}
+			error_stats_dict['error_rate_per_hour'] = self.error_handler.get_error_rate_per_hour()
+		else:
+			error_stats_dict = self.error_handler.get_error_stats().to_dict()
+			if version is not None:
+				self._error_stats_cache = (
+					version, {k: dict(v) if isinstance(v, dict) else v for k, v in error_stats_dict.items()}
+				)
 		
 		return {
 			'cached_modules': self.cache_manager.get_keys(),
@@ -956,7 +974,7 @@ class DynamicModuleImporter:
 				'strategy': self.cache_manager.strategy.value
 			},
 			'legacy_cache_removed': True,  # 旧缓存系统已移除
-			'error_stats': error_stats.to_dict()  # 错误统计信息
+			'error_stats': error_stats_dict  # 错误统计信息
 		}
 	
 	def get_module_config(self, module_name: str) -> Optional[Dict[str, Any]]:
@@ -975,12 +993,25 @@ class DynamicModuleImporter:
 	def set_correlation_id(self, correlation_id: str) -> None:
 		"""
 		设置当前操作的correlation_id，供快照与日志关联。
+		值保存在上下文变量中，仅对当前线程/协程上下文可见。
 		"""
-		self._correlation_id = correlation_id
+		self._cv_token = _CORRELATION.set(correlation_id)
 
 	def get_correlation_id(self) -> Optional[str]:
-		"""获取当前关联的correlation_id。"""
-		return getattr(self, "_correlation_id", None)
+		"""获取当前上下文关联的correlation_id。"""
+		return _CORRELATION.get()
+
+	def reset_correlation_id(self) -> None:
+		"""还原最近一次set_correlation_id之前的correlation_id。"""
+		token = self._cv_token
+		if token is None:
+			return
+		self._cv_token = None
+		try:
+			_CORRELATION.reset(token)
+		except ValueError:
+			# 令牌来自其他上下文（例如跨线程调用），直接清空当前上下文的值
+			_CORRELATION.set(None)
 
 	# === V4.2 扩展：获取不可调用的函数名列表 ===
 	def _get_non_callable_functions(self, module_obj) -> List[str]:
@@ -1075,23 +1106,26 @@ class DynamicModuleImporter:
 			'module_reports': {}
 		}
 		
+		# _module_paths 需保持 dict[str, dict] 结构（测试与配置脚本会直接读写），
+		# 这里只做一次遍历并复用条目引用，避免重复的多级字典查找
+		module_reports = report['module_reports']
 		for module_name, module_config in self._module_paths.items():
-			report['module_reports'][module_name] = {
+			required_functions = module_config['required_functions']
+			entry = module_reports[module_name] = {
 				'path': module_config['path'],
-				'required_functions': module_config['required_functions'],
+				'required_functions': required_functions,
 				'validation_status': 'Not checked'
 			}
 			
 			if module_name == 'markdown_processor':
 				try:
 					from markdown_processor import render_markdown_with_zoom, render_markdown_to_html
-					required_functions = module_config['required_functions']
 					validation_result = self._validate_function_mapping(
 						required_functions, 
 						render_markdown_with_zoom, 
 						render_markdown_to_html
 					)
-					report['module_reports'][module_name]['validation_status'] = {
+					entry['validation_status'] = {
 						'is_valid': validation_result['is_valid'],
 						'details': validation_result['details'],
 						'missing_functions': validation_result['missing_functions'],
@@ -1099,7 +1133,7 @@ class DynamicModuleImporter:
 						'validation_summary': validation_result['validation_summary']
 					}
 				except ImportError:
-					report['module_reports'][module_name]['validation_status'] = {
+					entry['validation_status'] = {
 						'is_valid': False,
 						'details': 'markdown_processor模块未导入，无法验证',
 						'missing_functions': [],
@@ -1107,7 +1141,7 @@ class DynamicModuleImporter:
 						'validation_summary': {}
 					}
 				except Exception as e:
-					report['module_reports'][module_name]['validation_status'] = {
+					entry['validation_status'] = {
 						'is_valid': False,
 						'details': f'验证失败: {e}',
 						'missing_functions': [],
@@ -12,20 +12,25 @@
 import sys
 import logging
 import time
+import itertools
+import functools
 import threading
-from collections import deque
+from collections import Counter, deque
 import traceback
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional, Union, List, Callable, Type
+from typing import Dict, Any, Optional, Union, List, Callable, Type, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
-import threading
-import queue
 import os
 import builtins
 
+try:
+    import orjson  # 可选依赖：更快的JSON编码器
+except ImportError:
+    orjson = None
+
 
 def _safe_open(*args, **kwargs):
     """安全文件打开封装：builtins.open -> io.open -> open。"""
@@ -118,25 +123,44 @@ class ErrorRecoveryStrategy(Enum):
     MANUAL = "manual"            # 手动处理
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorContext:
     """错误上下文数据类"""
     timestamp: float
     module: str
     function: str
     line_number: int
+    # 堆栈文本；为空且有stack_frames时由format_stack_trace()按需生成并回填
     stack_trace: str
     user_context: Optional[Dict[str, Any]] = None
     system_context: Optional[Dict[str, Any]] = None
+    # 紧凑的堆栈帧 (filename, lineno, function)；首次调用format_stack_trace()时才格式化为文本
+    stack_frames: Optional[List[Tuple[str, int, str]]] = None
+    
+    def format_stack_trace(self) -> str:
+        """返回堆栈文本：优先使用已有文本，否则由stack_frames生成并回填到stack_trace"""
+        if self.stack_trace or not self.stack_frames:
+            return self.stack_trace
+        self.stack_trace = "\n".join(
+            f"  {filename}:{lineno} in {name}" for filename, lineno, name in self.stack_frames
+        )
+        return self.stack_trace
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        data = asdict(self)
-        data['timestamp_iso'] = datetime.fromtimestamp(self.timestamp).isoformat()
-        return data
+        """转换为字典格式（逐字段构建，避免asdict的递归深拷贝）"""
+        return {
+            'timestamp': self.timestamp,
+            'module': self.module,
+            'function': self.function,
+            'line_number': self.line_number,
+            'stack_trace': self.format_stack_trace(),
+            'user_context': dict(self.user_context) if self.user_context is not None else None,
+            'system_context': dict(self.system_context) if self.system_context is not None else None,
+            'timestamp_iso': datetime.fromtimestamp(self.timestamp).isoformat(),
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorInfo:
     """错误信息数据类"""
     error_id: str
@@ -153,18 +177,27 @@ class ErrorInfo:
     resolution_method: Optional[str] = None
     
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        data = asdict(self)
-        data['severity'] = self.severity.value
-        data['category'] = self.category.value
-        data['recovery_strategy'] = self.recovery_strategy.value
-        data['context'] = self.context.to_dict()
+        """转换为字典格式（逐字段构建，嵌套上下文直接复用其to_dict结果）"""
+        data = {
+            'error_id': self.error_id,
+            'error_type': self.error_type,
+            'error_message': self.error_message,
+            'severity': self.severity.value,
+            'category': self.category.value,
+            'context': self.context.to_dict(),
+            'recovery_strategy': self.recovery_strategy.value,
+            'retry_count': self.retry_count,
+            'max_retries': self.max_retries,
+            'resolved': self.resolved,
+            'resolution_time': self.resolution_time,
+            'resolution_method': self.resolution_method,
+        }
         if self.resolution_time:
             data['resolution_time_iso'] = datetime.fromtimestamp(self.resolution_time).isoformat()
         return data
 
 
-@dataclass
+@dataclass(slots=True)
 class ErrorStats:
     """错误统计信息数据类"""
     total_errors: int
@@ -181,9 +214,74 @@ class ErrorStats:
         return asdict(self)
 
 
+# 错误ID：进程启动时间戳前缀 + 进程内单调递增序号（next()在GIL下为原子操作）
+_BOOT_MS = int(time.time() * 1000)
+_ERROR_ID_COUNTER = itertools.count(1)
+
+
+# 关闭时投递到错误队列的哨兵：由处理线程保存错误报告后退出
+_SHUTDOWN_SAVE = object()
+
+
+# 异常类型 -> 错误分类规则（有序，靠前的规则优先匹配）
+_EXC_CATEGORY_RULES = (
+    ((ConnectionError, TimeoutError), ErrorCategory.NETWORK),
+    ((FileNotFoundError, PermissionError, OSError), ErrorCategory.FILE_IO),
+    ((KeyError, ValueError, TypeError), ErrorCategory.CONFIGURATION),
+    ((ImportError, ModuleNotFoundError), ErrorCategory.MODULE_IMPORT),
+    ((SyntaxError, AttributeError), ErrorCategory.RENDERING),
+    ((MemoryError, SystemError), ErrorCategory.SYSTEM),
+)
+
+
 class EnhancedErrorHandler:
     """增强错误处理器"""
     
+    # 系统上下文采样的最小间隔（秒），突发错误时复用最近一次采样结果
+    SYSTEM_CONTEXT_TTL = 1.0
+    
+    # 关闭时等待处理线程保存报告的最长时间（秒），超时后改为同步保存
+    SHUTDOWN_JOIN_TIMEOUT = 5.0
+    
+    # 调用方模块名缓存的容量上限，超出后整体清空
+    MODULE_CACHE_SIZE = 256
+    
+    # 错误严重程度 -> 标准日志级别
+    _LEVEL_MAP = {
+        ErrorSeverity.CRITICAL: logging.CRITICAL,
+        ErrorSeverity.HIGH: logging.ERROR,
+        ErrorSeverity.MEDIUM: logging.WARNING,
+        ErrorSeverity.LOW: logging.INFO,
+    }
+    
+    # 枚举成员到字符串值的预计算映射，仅在输出统计时使用
+    _SEV_VALUE = {s: s.value for s in ErrorSeverity}
+    _CAT_VALUE = {c: c.value for c in ErrorCategory}
+    
+    # 默认错误处理器配置：异常类型 -> (错误类型名, 严重程度, 分类, 恢复策略)
+    # 错误类型名取自异常类的 __name__ 并驻留，所有同类错误共享同一字符串对象
+    _ERROR_PROFILES: Dict[type, Tuple[str, ErrorSeverity, ErrorCategory, ErrorRecoveryStrategy]] = {
+        exc_type: (sys.intern(exc_type.__name__),) + profile
+        for exc_type, profile in {
+            # 文件I/O错误
+            FileNotFoundError: (ErrorSeverity.HIGH, ErrorCategory.FILE_IO, ErrorRecoveryStrategy.RETRY),
+            PermissionError: (ErrorSeverity.HIGH, ErrorCategory.FILE_IO, ErrorRecoveryStrategy.ABORT),
+            OSError: (ErrorSeverity.MEDIUM, ErrorCategory.FILE_IO, ErrorRecoveryStrategy.RETRY),
+            # 网络错误
+            ConnectionError: (ErrorSeverity.HIGH, ErrorCategory.NETWORK, ErrorRecoveryStrategy.RETRY),
+            TimeoutError: (ErrorSeverity.MEDIUM, ErrorCategory.NETWORK, ErrorRecoveryStrategy.RETRY),
+            # 配置错误
+            KeyError: (ErrorSeverity.MEDIUM, ErrorCategory.CONFIGURATION, ErrorRecoveryStrategy.FALLBACK),
+            ValueError: (ErrorSeverity.MEDIUM, ErrorCategory.CONFIGURATION, ErrorRecoveryStrategy.FALLBACK),
+            # 导入错误
+            ImportError: (ErrorSeverity.MEDIUM, ErrorCategory.MODULE_IMPORT, ErrorRecoveryStrategy.FALLBACK),
+            ModuleNotFoundError: (ErrorSeverity.MEDIUM, ErrorCategory.MODULE_IMPORT, ErrorRecoveryStrategy.FALLBACK),
+            # 渲染错误
+            SyntaxError: (ErrorSeverity.HIGH, ErrorCategory.RENDERING, ErrorRecoveryStrategy.FALLBACK),
+            AttributeError: (ErrorSeverity.MEDIUM, ErrorCategory.RENDERING, ErrorRecoveryStrategy.FALLBACK),
+        }.items()
+    }
+    
     def __init__(self, error_log_dir: Optional[Union[str, Path]] = None,
                  max_error_history: int = 1000,
                  config_manager: Optional[Any] = None):
@@ -197,25 +295,42 @@ class EnhancedErrorHandler:
         """
         # 初始化基本属性
         self.config_manager = config_manager
-        self.error_log_dir = error_log_dir
         self.max_error_history = max_error_history or 1000
         self.error_history = deque(maxlen=self.max_error_history)
         
         # 初始化日志记录器
         self.logger = logging.getLogger(__name__)
         
-        # 初始化错误处理策略
-        self.error_strategy = "graceful"  # 默认graceful模式
-        self.auto_recovery = False  # 默认关闭自动恢复
-        self._load_error_strategy()
+        # 错误日志目录：统一规范为Path并一次性创建（允许传入str）
+        self.error_log_dir: Optional[Path] = Path(error_log_dir) if error_log_dir else None
+        if self.error_log_dir is not None:
+            self.error_log_dir.mkdir(parents=True, exist_ok=True)
+            self.logger.info(f"错误日志目录初始化: {self.error_log_dir}")
         
         # 错误处理器映射
         self.error_handlers: Dict[Type[Exception], Callable] = {}
         
+        # 异常类型 -> 已解析处理器缓存（含未命中的None），注册新处理器时清空
+        self._handler_cache: Dict[type, Optional[Callable]] = {}
+        
         # 恢复策略映射
         self.recovery_strategies: Dict[ErrorCategory, ErrorRecoveryStrategy] = {}
         
-        # 错误统计
+        # 初始化错误处理策略
+        self.error_strategy = "graceful"  # 默认graceful模式
+        self.auto_recovery = False  # 默认关闭自动恢复
+        self._load_error_strategy()
+        
+        # 恢复策略 -> 处理方法分派表
+        self._strategy_dispatch: Dict[ErrorRecoveryStrategy, Callable[[ErrorInfo], None]] = {
+            ErrorRecoveryStrategy.RETRY: self._handle_retry_strategy,
+            ErrorRecoveryStrategy.FALLBACK: self._handle_fallback_strategy,
+            ErrorRecoveryStrategy.IGNORE: self._handle_ignore_strategy,
+            ErrorRecoveryStrategy.ABORT: self._handle_abort_strategy,
+            ErrorRecoveryStrategy.MANUAL: self._handle_manual_strategy,
+        }
+        
+        # 错误统计（errors_by_* 分布由下方计数器维护，经 get_error_stats() 输出快照）
         self.error_stats = ErrorStats(
             total_errors=0,
             errors_by_severity={},
@@ -227,14 +342,38 @@ class EnhancedErrorHandler:
             error_rate_per_hour=0.0
         )
         
+        # 分布计数器：严重程度/分类以枚举对象为键，输出统计时再转换为字符串
+        self._severity_counts: Counter = Counter()
+        self._category_counts: Counter = Counter()
+        self._module_counts: Counter = Counter()
+        
+        # 按严重程度/分类索引的错误历史（与error_history同序同步淘汰）
+        self._by_severity: Dict[ErrorSeverity, deque] = {}
+        self._by_category: Dict[ErrorCategory, deque] = {}
+        
+        # 已解决错误的解决耗时累计（秒），用于O(1)维护平均解决时间
+        self._resolution_time_total = 0.0
+        
+        # 异常类型 -> 错误分类缓存
+        self._category_cache: Dict[type, ErrorCategory] = {}
+        
+        # 调用方代码对象 -> 模块名缓存，避免每次查询frame.f_globals
+        self._module_cache: Dict[Any, str] = {}
+        
+        # 系统上下文缓存：psutil模块句柄（None=未加载，False=不可用）与最近一次采样
+        self._psutil = None
+        self._system_context_cache: Optional[tuple] = None
+        
+        # 统计版本号：每次错误统计发生变化时单调递增，供调用方做缓存判定
+        self.version = 0
+        
         # 线程安全
         self._lock = threading.RLock()
         
-        # 日志
-        self.logger = logging.getLogger(__name__)
-        
-        # 错误队列（用于异步处理）
-        self.error_queue = queue.Queue()
+        # 错误队列（用于异步处理）：单消费者多生产者，deque的append/popleft在GIL下原子，
+        # 配合Event唤醒处理线程，省去queue.Queue每次put/get的锁与条件变量开销
+        self._error_dq: deque = deque()
+        self._error_event = threading.Event()
         self._processing_thread = None
         self._stop_processing = False
         
@@ -269,11 +408,6 @@ class EnhancedErrorHandler:
     def _initialize_error_handler(self):
         """初始化错误处理器"""
         try:
-            # 创建错误日志目录
-            if self.error_log_dir:
-                self.error_log_dir.mkdir(parents=True, exist_ok=True)
-                self.logger.info(f"错误日志目录初始化: {self.error_log_dir}")
-            
             # 注册默认错误处理器
             self._register_default_handlers()
             
@@ -291,26 +425,8 @@ class EnhancedErrorHandler:
     
     def _register_default_handlers(self):
         """注册默认错误处理器"""
-        # 文件I/O错误
-        self.register_error_handler(FileNotFoundError, self._handle_file_not_found)
-        self.register_error_handler(PermissionError, self._handle_permission_error)
-        self.register_error_handler(OSError, self._handle_os_error)
-        
-        # 网络错误
-        self.register_error_handler(ConnectionError, self._handle_connection_error)
-        self.register_error_handler(TimeoutError, self._handle_timeout_error)
-        
-        # 配置错误
-        self.register_error_handler(KeyError, self._handle_key_error)
-        self.register_error_handler(ValueError, self._handle_value_error)
-        
-        # 导入错误
-        self.register_error_handler(ImportError, self._handle_import_error)
-        self.register_error_handler(ModuleNotFoundError, self._handle_module_not_found)
-        
-        # 渲染错误
-        self.register_error_handler(SyntaxError, self._handle_syntax_error)
-        self.register_error_handler(AttributeError, self._handle_attribute_error)
+        for exception_type in self._ERROR_PROFILES:
+            self.register_error_handler(exception_type, self._build_error_info)
     
     def _setup_default_recovery_strategies(self):
         """设置默认恢复策略"""
@@ -339,34 +455,44 @@ class EnhancedErrorHandler:
             self._processing_thread.start()
             self.logger.info("错误异步处理线程已启动")
     
+    def _enqueue_error(self, item: Any):
+        """投递到异步处理队列并唤醒处理线程"""
+        self._error_dq.append(item)
+        self._error_event.set()
+    
     def _process_error_queue(self):
-        """处理错误队列"""
+        """处理错误队列（被唤醒后一次性取空队列）"""
+        error_dq = self._error_dq
+        error_event = self._error_event
         while not self._stop_processing:
-            try:
-                # 从队列获取错误信息
-                error_info = self.error_queue.get(timeout=1)
-                self._process_error_async(error_info)
-                self.error_queue.task_done()
-            except queue.Empty:
+            if not error_event.wait(timeout=1):
                 continue
-            except Exception as e:
-                self.logger.error(f"处理错误队列异常: {e}")
+            # 先清除事件再取队列：取空之后新投递的元素会重新置位事件
+            error_event.clear()
+            shutdown_requested = False
+            while True:
+                try:
+                    error_info = error_dq.popleft()
+                except IndexError:
+                    break
+                if error_info is _SHUTDOWN_SAVE:
+                    shutdown_requested = True
+                    continue
+                try:
+                    self._process_error_async(error_info)
+                except Exception as e:
+                    self.logger.error(f"处理错误队列异常: {e}")
+            if shutdown_requested:
+                # 在处理线程中完成报告写盘，随后退出
+                self.save_error_report()
+                return
     
     def _process_error_async(self, error_info: ErrorInfo):
         """异步处理错误"""
         try:
-            # 根据恢复策略处理错误
-            if error_info.recovery_strategy == ErrorRecoveryStrategy.RETRY:
-                self._handle_retry_strategy(error_info)
-            elif error_info.recovery_strategy == ErrorRecoveryStrategy.FALLBACK:
-                self._handle_fallback_strategy(error_info)
-            elif error_info.recovery_strategy == ErrorRecoveryStrategy.IGNORE:
-                self._handle_ignore_strategy(error_info)
-            elif error_info.recovery_strategy == ErrorRecoveryStrategy.ABORT:
-                self._handle_abort_strategy(error_info)
-            else:
-                self._handle_manual_strategy(error_info)
-                
+            # 根据恢复策略处理错误（未知策略按手动处理）
+            handler = self._strategy_dispatch.get(error_info.recovery_strategy, self._handle_manual_strategy)
+            handler(error_info)
         except Exception as e:
             self.logger.error(f"异步处理错误失败: {e}")
     
@@ -380,6 +506,7 @@ class EnhancedErrorHandler:
             handler: 处理函数
         """
         self.error_handlers[exception_type] = handler
+        self._handler_cache.clear()
         self.logger.debug(f"注册错误处理器: {exception_type.__name__}")
     
     def handle_error(self, 
@@ -400,16 +527,21 @@ class EnhancedErrorHandler:
         Raises:
             exception: 在strict模式下会重新抛出异常
         """
+        # strict模式下异常会立即向上抛出：若该异常类型没有注册自定义处理器，
+        # 则走轻量路径（不采集堆栈帧与系统上下文），但仍完整记录历史与统计，保持计数一致
+        strict = self.error_strategy == "strict"
+        lightweight = strict and self._find_error_handler(exception) is None
+        
         # 处理不同类型的context参数
         if context is None:
-            error_context = self._create_error_context()
+            error_context = self._create_error_context(lightweight=lightweight)
         elif isinstance(context, dict):
-            error_context = self._create_error_context(context)
+            error_context = self._create_error_context(context, lightweight=lightweight)
         elif isinstance(context, ErrorContext):
             error_context = context
         else:
             self.logger.warning(f"不支持的context类型: {type(context).__name__}, 使用默认上下文")
-            error_context = self._create_error_context()
+            error_context = self._create_error_context(lightweight=lightweight)
             
         # 创建错误信息
         error_info = self._create_default_error_info(exception, error_context)
@@ -435,48 +567,79 @@ class EnhancedErrorHandler:
         # 记录日志
         self._log_error(error_info)
         
-        # 根据策略处理错误
-        if self.error_strategy == "strict":
-            # 在strict模式下重新抛出异常
+        # 在strict模式下重新抛出异常
+        if strict:
             raise exception
-            
+        
         # 在graceful模式下尝试自动恢复
         if self.auto_recovery:
             self._try_auto_recovery(error_info)
         
         return error_info
         
-    def _create_error_context(self, context: Optional[Dict[str, Any]] = None) -> ErrorContext:
+    def _create_error_context(self, context: Optional[Dict[str, Any]] = None,
+                              lightweight: bool = False) -> ErrorContext:
         """
         创建错误上下文
         
         Args:
             context: 可选的用户上下文信息，可以是字典或None
+            lightweight: 为True时不采集堆栈帧与系统上下文（strict模式下异常随即抛出）
             
         Returns:
             ErrorContext: 错误上下文对象
         """
         # 获取当前调用栈信息
         frame = sys._getframe(2)  # 跳过handle_error和_create_error_context
+        code = frame.f_code
+        module_cache = self._module_cache
+        module_name = module_cache.get(code)
+        if module_name is None:
+            module_name = frame.f_globals.get('__name__', 'unknown')
+            if len(module_cache) >= self.MODULE_CACHE_SIZE:
+                module_cache.clear()
+            module_cache[code] = module_name
         
         # 确保user_context是字典类型
         user_context = context if isinstance(context, dict) else {}
         
+        # 仅记录活动异常的堆栈帧元组，不读取源码行也不预先格式化文本
+        tb = None if lightweight else sys.exc_info()[2]
+        stack_frames = [
+            (tb_frame.f_code.co_filename, lineno, tb_frame.f_code.co_name)
+            for tb_frame, lineno in traceback.walk_tb(tb)
+        ] if tb is not None else None
+        
         return ErrorContext(
             timestamp=time.time(),
-            module=frame.f_globals.get('__name__', 'unknown'),
-            function=frame.f_code.co_name,
+            module=module_name,
+            function=code.co_name,
             line_number=frame.f_lineno,
-            stack_trace=traceback.format_exc(),
+            stack_trace="",
             user_context=user_context if user_context else None,
-            system_context=self._get_system_context()
+            system_context=None if lightweight else self._get_system_context(),
+            stack_frames=stack_frames
         )
     
     def _get_system_context(self) -> Dict[str, Any]:
-        """获取系统上下文"""
+        """获取系统上下文（按SYSTEM_CONTEXT_TTL节流，避免每个错误都触发系统调用）"""
+        now = time.monotonic()
+        cached = self._system_context_cache
+        if cached is not None and now - cached[0] < self.SYSTEM_CONTEXT_TTL:
+            return dict(cached[1])
+        
+        psutil = self._psutil
+        if psutil is None:
+            try:
+                import psutil
+            except Exception:
+                psutil = False
+            self._psutil = psutil
+        if psutil is False:
+            return {}
+        
         try:
-            import psutil
-            return {
+            system_context = {
                 'memory_usage': psutil.virtual_memory().percent,
                 'cpu_usage': psutil.cpu_percent(),
                 'disk_usage': psutil.disk_usage('/').percent,
@@ -485,22 +648,24 @@ class EnhancedErrorHandler:
             }
         except Exception:
             return {}
+        self._system_context_cache = (now, system_context)
+        return dict(system_context)
     
     def _find_error_handler(self, exception: Exception) -> Optional[Callable]:
         """查找错误处理器"""
-        # 按异常类型层次结构查找
         exception_type = type(exception)
+        cache = self._handler_cache
+        if exception_type in cache:
+            return cache[exception_type]
         
-        # 直接匹配
-        if exception_type in self.error_handlers:
-            return self.error_handlers[exception_type]
-        
-        # 查找父类
-        for base_type in exception_type.__mro__[1:]:
-            if base_type in self.error_handlers:
-                return self.error_handlers[base_type]
-        
-        return None
+        # 按异常类型层次结构查找（__mro__首项即类型本身，相当于先直接匹配再查父类）
+        handler = None
+        for base_type in exception_type.__mro__:
+            handler = self.error_handlers.get(base_type)
+            if handler is not None:
+                break
+        cache[exception_type] = handler
+        return handler
     
     def _create_default_error_info(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
         """创建默认错误信息"""
@@ -532,23 +697,20 @@ class EnhancedErrorHandler:
         # 处理异常类型（类）或异常实例
         exception_type = exception if isinstance(exception, type) else type(exception)
         
-        # 检查继承关系时，先检查具体的异常类型，再检查基类
-        if issubclass(exception_type, ConnectionError):
-            return ErrorCategory.NETWORK
-        elif issubclass(exception_type, TimeoutError):
-            return ErrorCategory.NETWORK
-        elif issubclass(exception_type, (FileNotFoundError, PermissionError, OSError)):
-            return ErrorCategory.FILE_IO
-        elif issubclass(exception_type, (KeyError, ValueError, TypeError)):
-            return ErrorCategory.CONFIGURATION
-        elif issubclass(exception_type, (ImportError, ModuleNotFoundError)):
-            return ErrorCategory.MODULE_IMPORT
-        elif issubclass(exception_type, (SyntaxError, AttributeError)):
-            return ErrorCategory.RENDERING
-        elif issubclass(exception_type, (MemoryError, SystemError)):
-            return ErrorCategory.SYSTEM
-        else:
-            return ErrorCategory.UNKNOWN
+        # 同一异常类型的分类结果恒定，命中缓存时直接返回
+        cache = self._category_cache
+        category = cache.get(exception_type)
+        if category is not None:
+            return category
+        
+        # 按规则顺序匹配：先检查具体的异常类型，再检查基类
+        category = ErrorCategory.UNKNOWN
+        for exc_types, rule_category in _EXC_CATEGORY_RULES:
+            if issubclass(exception_type, exc_types):
+                category = rule_category
+                break
+        cache[exception_type] = category
+        return category
     
     def _determine_severity(self, category: ErrorCategory, exception: Exception) -> ErrorSeverity:
         """确定错误严重程度"""
@@ -562,33 +724,38 @@ class EnhancedErrorHandler:
             return ErrorSeverity.LOW
     
     def _generate_error_id(self) -> str:
-        """生成错误ID"""
-        return f"ERR_{int(time.time() * 1000)}_{threading.get_ident()}"
+        """生成错误ID（进程内唯一，无需每次读取系统时间）"""
+        return f"ERR_{_BOOT_MS}_{next(_ERROR_ID_COUNTER)}"
     
     def _record_error(self, error_info: ErrorInfo):
         """记录错误"""
-        self.error_history.append(error_info)
+        # error_history 为定长deque，已满时append会自动淘汰最左侧元素；
+        # 追加前取出即将被淘汰的条目，以便同步修正已解决/未解决计数
+        history = self.error_history
+        evicted = history[0] if len(history) == history.maxlen else None
+        history.append(error_info)
         self.error_stats.total_errors += 1
+        self.version += 1
         
-        # 更新统计信息
-        severity_key = error_info.severity.value
-        category_key = error_info.category.value
-        module_key = error_info.context.module
-        
-        self.error_stats.errors_by_severity[severity_key] = \
-            self.error_stats.errors_by_severity.get(severity_key, 0) + 1
-        
-        self.error_stats.errors_by_category[category_key] = \
-            self.error_stats.errors_by_category.get(category_key, 0) + 1
+        # 更新索引：被淘汰的条目必然是其所在分组中最早的一条
+        by_severity = self._by_severity
+        by_category = self._by_category
+        if evicted is not None:
+            by_severity[evicted.severity].popleft()
+            by_category[evicted.category].popleft()
+        by_severity.setdefault(error_info.severity, deque()).append(error_info)
+        by_category.setdefault(error_info.category, deque()).append(error_info)
         
-        self.error_stats.errors_by_module[module_key] = \
-            self.error_stats.errors_by_module.get(module_key, 0) + 1
+        # 更新统计信息
+        self._severity_counts[error_info.severity] += 1
+        self._category_counts[error_info.category] += 1
+        self._module_counts[error_info.context.module] += 1
         
-        # 限制历史记录大小
-        if len(self.error_history) > self.max_error_history:
-            removed_error = self.error_history.pop(0)
-            if removed_error.resolved:
+        if evicted is not None:
+            if evicted.resolved:
                 self.error_stats.resolved_errors -= 1
+                self._resolution_time_total -= self._resolution_delta(evicted)
+                self._update_average_resolution_time()
             else:
                 self.error_stats.unresolved_errors -= 1
         
@@ -597,17 +764,13 @@ class EnhancedErrorHandler:
             self.error_stats.unresolved_errors += 1
     
     def _log_error(self, error_info: ErrorInfo):
-        """记录错误日志"""
-        log_message = f"错误 {error_info.error_id}: {error_info.error_type} - {error_info.error_message}"
-        
-        if error_info.severity == ErrorSeverity.CRITICAL:
-            self.logger.critical(log_message)
-        elif error_info.severity == ErrorSeverity.HIGH:
-            self.logger.error(log_message)
-        elif error_info.severity == ErrorSeverity.MEDIUM:
-            self.logger.warning(log_message)
-        else:
-            self.logger.info(log_message)
+        """记录错误日志（日志级别未启用时不构建消息）"""
+        level = self._LEVEL_MAP.get(error_info.severity, logging.INFO)
+        if self.logger.isEnabledFor(level):
+            self.logger.log(
+                level, "错误 %s: %s - %s",
+                error_info.error_id, error_info.error_type, error_info.error_message
+            )
     
     def _handle_retry_strategy(self, error_info: ErrorInfo):
         """处理重试策略"""
@@ -650,32 +813,57 @@ class EnhancedErrorHandler:
             
             self.error_stats.resolved_errors += 1
             self.error_stats.unresolved_errors -= 1
+            self.version += 1
             
-            # 更新平均解决时间
-            if self.error_stats.resolved_errors > 0:
-                total_time = sum(
-                    (e.resolution_time or 0) - e.context.timestamp
-                    for e in self.error_history
-                    if e.resolved and e.resolution_time
-                )
-                self.error_stats.average_resolution_time = total_time / self.error_stats.resolved_errors
+            # 更新平均解决时间（累计值增量维护，避免每次遍历历史记录）
+            self._resolution_time_total += self._resolution_delta(error_info)
+            self._update_average_resolution_time()
+    
+    @staticmethod
+    def _resolution_delta(error_info: ErrorInfo) -> float:
+        """计算单个错误的解决耗时，无法计算时返回0"""
+        try:
+            if not error_info.resolution_time:
+                return 0.0
+            return float(error_info.resolution_time - error_info.context.timestamp)
+        except (AttributeError, TypeError, ValueError):
+            return 0.0
+    
+    def _update_average_resolution_time(self):
+        """根据累计解决耗时刷新平均解决时间"""
+        resolved = self.error_stats.resolved_errors
+        self.error_stats.average_resolution_time = (
+            self._resolution_time_total / resolved if resolved > 0 else 0.0
+        )
+    
+    def get_error_rate_per_hour(self) -> float:
+        """按首条历史错误至今的时长计算每小时错误率（随时间变化，不随version缓存）"""
+        with self._lock:
+            return self._update_error_rate()
+    
+    def _update_error_rate(self) -> float:
+        """刷新并返回错误率（调用方需持有锁）"""
+        if self.error_history:
+            first_error_time = self.error_history[0].context.timestamp
+            current_time = time.time()
+            hours_elapsed = (current_time - first_error_time) / 3600
+            if hours_elapsed > 0:
+                self.error_stats.error_rate_per_hour = self.error_stats.total_errors / hours_elapsed
+        return self.error_stats.error_rate_per_hour
     
     def get_error_stats(self) -> ErrorStats:
         """获取错误统计信息"""
         with self._lock:
             # 计算错误率
-            if self.error_history:
-                first_error_time = self.error_history[0].context.timestamp
-                current_time = time.time()
-                hours_elapsed = (current_time - first_error_time) / 3600
-                if hours_elapsed > 0:
-                    self.error_stats.error_rate_per_hour = self.error_stats.total_errors / hours_elapsed
+            self._update_error_rate()
             
+            sev_value = self._SEV_VALUE
+            cat_value = self._CAT_VALUE
             return ErrorStats(
                 total_errors=self.error_stats.total_errors,
-                errors_by_severity=self.error_stats.errors_by_severity.copy(),
-                errors_by_category=self.error_stats.errors_by_category.copy(),
-                errors_by_module=self.error_stats.errors_by_module.copy(),
+                errors_by_severity={sev_value[k]: v for k, v in self._severity_counts.items()},
+                errors_by_category={cat_value[k]: v for k, v in self._category_counts.items()},
+                errors_by_module=dict(self._module_counts),
                 resolved_errors=self.error_stats.resolved_errors,
                 unresolved_errors=self.error_stats.unresolved_errors,
                 average_resolution_time=self.error_stats.average_resolution_time,
@@ -699,17 +887,28 @@ class EnhancedErrorHandler:
             错误历史列表
         """
         with self._lock:
-            filtered_errors = list(self.error_history)  # 确保是列表类型
-            
-            if severity:
-                filtered_errors = [e for e in filtered_errors if e.severity == severity]
-            
-            if category:
-                filtered_errors = [e for e in filtered_errors if e.category == category]
+            # 优先从较小的索引分组开始遍历，只对剩余条件逐条过滤
+            if severity and category:
+                base = min(
+                    self._by_severity.get(severity, ()),
+                    self._by_category.get(category, ()),
+                    key=len,
+                )
+            elif severity:
+                base = self._by_severity.get(severity, ())
+            elif category:
+                base = self._by_category.get(category, ())
+            else:
+                base = self.error_history
             
-            if resolved is not None:
-                filtered_errors = [e for e in filtered_errors if e.resolved == resolved]
+            filtered_errors = [
+                e for e in base
+                if (not severity or e.severity == severity)
+                and (not category or e.category == category)
+                and (resolved is None or e.resolved == resolved)
+            ]
             
+            # 先截取再序列化，仅对返回的条目调用to_dict()
             return [error.to_dict() for error in filtered_errors[-limit:]]
     
     def clear_error_history(self):
@@ -726,11 +925,18 @@ class EnhancedErrorHandler:
                 average_resolution_time=0.0,
                 error_rate_per_hour=0.0
             )
+            self._by_severity.clear()
+            self._by_category.clear()
+            self._severity_counts.clear()
+            self._category_counts.clear()
+            self._module_counts.clear()
+            self._resolution_time_total = 0.0
+            self.version += 1
         self.logger.info("错误历史已清空")
     
     def save_error_report(self, filename: Optional[str] = None) -> bool:
         """保存错误报告"""
-        if not self.error_log_dir:
+        if self.error_log_dir is None:
             return False
         
         try:
@@ -747,8 +953,14 @@ class EnhancedErrorHandler:
                 'recent_errors': self.get_error_history(50)
             }
             
-            with _safe_open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, indent=2, ensure_ascii=False)
+            if orjson is not None:
+                # orjson直接输出UTF-8字节，等价于ensure_ascii=False
+                data = orjson.dumps(report_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+                with _safe_open(filepath, 'wb') as f:
+                    f.write(data)
+            else:
+                with _safe_open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump(report_data, f, indent=2, ensure_ascii=False)
             
             self.logger.info(f"错误报告已保存: {filepath}")
             return True
@@ -759,135 +971,42 @@ class EnhancedErrorHandler:
     
     def shutdown(self):
         """关闭错误处理器"""
-        self._stop_processing = True
-        if self._processing_thread:
-            self._processing_thread.join(timeout=5)
-        
-        # 保存错误报告
-        self.save_error_report()
+        thread = self._processing_thread
+        if thread is not None and thread.is_alive():
+            # 由处理线程在处理完已入队错误后保存报告；哨兵本身即终止信号
+            self._enqueue_error(_SHUTDOWN_SAVE)
+            thread.join(timeout=self.SHUTDOWN_JOIN_TIMEOUT)
+            self._stop_processing = True
+            if thread.is_alive():
+                # 处理线程卡住或过慢：不能依赖其写盘，改为同步保存错误报告
+                self.logger.warning("错误处理线程未在超时内退出，同步保存错误报告")
+                self.save_error_report()
+        else:
+            # 未启动处理线程（如测试模式）时同步保存错误报告
+            self._stop_processing = True
+            self.save_error_report()
         
         self.logger.info("增强错误处理器已关闭")
     
     # 默认错误处理器方法
-    def _handle_file_not_found(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
-        return ErrorInfo(
-            error_id=self._generate_error_id(),
-            error_type="FileNotFoundError",
-            error_message=str(exception),
-            severity=ErrorSeverity.HIGH,
-            category=ErrorCategory.FILE_IO,
-            context=context,
-            recovery_strategy=ErrorRecoveryStrategy.RETRY
-        )
-    
-    def _handle_permission_error(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
-        return ErrorInfo(
-            error_id=self._generate_error_id(),
-            error_type="PermissionError",
-            error_message=str(exception),
-            severity=ErrorSeverity.HIGH,
-            category=ErrorCategory.FILE_IO,
-            context=context,
-            recovery_strategy=ErrorRecoveryStrategy.ABORT
-        )
-    
-    def _handle_os_error(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
-        return ErrorInfo(
-            error_id=self._generate_error_id(),
-            error_type="OSError",
-            error_message=str(exception),
-            severity=ErrorSeverity.MEDIUM,
-            category=ErrorCategory.FILE_IO,
-            context=context,
-            recovery_strategy=ErrorRecoveryStrategy.RETRY
-        )
-    
-    def _handle_connection_error(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
-        return ErrorInfo(
-            error_id=self._generate_error_id(),
-            error_type="ConnectionError",
-            error_message=str(exception),
-            severity=ErrorSeverity.HIGH,
-            category=ErrorCategory.NETWORK,
-            context=context,
-            recovery_strategy=ErrorRecoveryStrategy.RETRY
-        )
-    
-    def _handle_timeout_error(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
-        return ErrorInfo(
-            error_id=self._generate_error_id(),
-            error_type="TimeoutError",
-            error_message=str(exception),
-            severity=ErrorSeverity.MEDIUM,
-            category=ErrorCategory.NETWORK,
-            context=context,
-            recovery_strategy=ErrorRecoveryStrategy.RETRY
-        )
-    
-    def _handle_key_error(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
-        return ErrorInfo(
-            error_id=self._generate_error_id(),
-            error_type="KeyError",
-            error_message=str(exception),
-            severity=ErrorSeverity.MEDIUM,
-            category=ErrorCategory.CONFIGURATION,
-            context=context,
-            recovery_strategy=ErrorRecoveryStrategy.FALLBACK
-        )
-    
-    def _handle_value_error(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
-        return ErrorInfo(
-            error_id=self._generate_error_id(),
-            error_type="ValueError",
-            error_message=str(exception),
-            severity=ErrorSeverity.MEDIUM,
-            category=ErrorCategory.CONFIGURATION,
-            context=context,
-            recovery_strategy=ErrorRecoveryStrategy.FALLBACK
-        )
-    
-    def _handle_import_error(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
-        return ErrorInfo(
-            error_id=self._generate_error_id(),
-            error_type="ImportError",
-            error_message=str(exception),
-            severity=ErrorSeverity.MEDIUM,
-            category=ErrorCategory.MODULE_IMPORT,
-            context=context,
-            recovery_strategy=ErrorRecoveryStrategy.FALLBACK
-        )
-    
-    def _handle_module_not_found(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
-        return ErrorInfo(
-            error_id=self._generate_error_id(),
-            error_type="ModuleNotFoundError",
-            error_message=str(exception),
-            severity=ErrorSeverity.MEDIUM,
-            category=ErrorCategory.MODULE_IMPORT,
-            context=context,
-            recovery_strategy=ErrorRecoveryStrategy.FALLBACK
-        )
-    
-    def _handle_syntax_error(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
-        return ErrorInfo(
-            error_id=self._generate_error_id(),
-            error_type="SyntaxError",
-            error_message=str(exception),
-            severity=ErrorSeverity.HIGH,
-            category=ErrorCategory.RENDERING,
-            context=context,
-            recovery_strategy=ErrorRecoveryStrategy.FALLBACK
-        )
-    
-    def _handle_attribute_error(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
+    def _build_error_info(self, exception: Exception, context: ErrorContext) -> ErrorInfo:
+        """按 _ERROR_PROFILES 中最近的父类配置构建错误信息"""
+        profiles = self._ERROR_PROFILES
+        for base_type in type(exception).__mro__:
+            profile = profiles.get(base_type)
+            if profile is not None:
+                break
+        else:
+            return self._create_default_error_info(exception, context)
+        error_type, severity, category, recovery_strategy = profile
         return ErrorInfo(
             error_id=self._generate_error_id(),
-            error_type="AttributeError",
+            error_type=error_type,
             error_message=str(exception),
-            severity=ErrorSeverity.MEDIUM,
-            category=ErrorCategory.RENDERING,
+            severity=severity,
+            category=category,
             context=context,
-            recovery_strategy=ErrorRecoveryStrategy.FALLBACK
+            recovery_strategy=recovery_strategy
         )
     
     def _create_basic_error_info(self, exception: Exception, message: str) -> ErrorInfo:
@@ -920,28 +1039,25 @@ def create_enhanced_error_handler(error_log_dir: Optional[Union[str, Path]] = No
 # 错误处理装饰器
 def handle_errors(recovery_strategy: Optional[ErrorRecoveryStrategy] = None,
                  context: Optional[Dict[str, Any]] = None):
-    """错误处理装饰器"""
+    """错误处理装饰器（错误处理器在装饰时从函数的 _error_handler 属性绑定）"""
     def decorator(func: Callable):
+        # 装饰时一次性获取错误处理器实例；没有处理器时原样返回函数
+        error_handler = getattr(func, '_error_handler', None)
+        if error_handler is None:
+            return func
+        
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            # 获取错误处理器实例
-            error_handler = getattr(func, '_error_handler', None)
-            if error_handler is None:
-                return func(*args, **kwargs)
-            
             try:
                 return func(*args, **kwargs)
             except Exception as e:
                 # 处理错误
                 error_info = error_handler.handle_error(e, context, recovery_strategy)
                 
-                # 根据恢复策略决定是否重新抛出异常
-                if error_info.recovery_strategy == ErrorRecoveryStrategy.ABORT:
-                    raise
-                elif error_info.recovery_strategy == ErrorRecoveryStrategy.IGNORE:
+                # 仅IGNORE策略吞掉异常，ABORT及其他策略均重新抛出
+                if error_info.recovery_strategy is ErrorRecoveryStrategy.IGNORE:
                     return None
-                else:
-                    # 其他策略可以返回默认值或重新抛出
-                    raise
+                raise
         
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator 
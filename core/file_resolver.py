@@ -11,27 +11,113 @@
 """
 
 import os
+import stat
+import codecs
+import io
 import mimetypes
 import logging
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 import json
 from collections import OrderedDict
+from functools import lru_cache
 import ctypes
 from ctypes import wintypes
 
-try:
-    import chardet
-    CHARDET_AVAILABLE = True
-except ImportError:
-    CHARDET_AVAILABLE = False
+import importlib.util
+
+# chardet 导入较重，仅检查是否安装，首次真正需要时再导入（见 _get_chardet）
+CHARDET_AVAILABLE = importlib.util.find_spec('chardet') is not None
+if not CHARDET_AVAILABLE:
     logging.warning("chardet库未安装，将使用基本编码检测方法")
 
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils.config_manager import ConfigManager
 
+_IS_WIN = os.name == 'nt'
+
+# BOM 签名（UTF-32 须先于 UTF-16 匹配）；使用不带字节序后缀的编解码器以便读取时去掉BOM
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+# 所有BOM的首字节，绝大多数文件据此一次判断即可跳过BOM匹配
+_BOM_LEADS = frozenset(bom[:1] for bom, _ in _BOMS)
+
+# 文件大小单位
+_SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+
+# UTF-8 增量解码器类，避免每次嗅探时查询编解码器注册表
+_Utf8IncrementalDecoder = codecs.getincrementaldecoder('utf-8')
+
+# Windows 下一次性绑定 GetLongPathNameW，避免每次调用重新设置签名
+_GetLongPathNameW = None
+if _IS_WIN:
+    try:
+        _GetLongPathNameW = ctypes.windll.kernel32.GetLongPathNameW
+        _GetLongPathNameW.argtypes = [wintypes.LPCWSTR, wintypes.LPWSTR, wintypes.DWORD]
+        _GetLongPathNameW.restype = wintypes.DWORD
+    except (AttributeError, OSError):
+        _GetLongPathNameW = None
+
+
+def _ext_of(path_str: str) -> str:
+    """返回小写扩展名，与 Path.suffix.lower() 结果一致（'name.' 返回空串）"""
+    ext = os.path.splitext(path_str)[1]
+    return ext.lower() if ext != '.' else ''
+
+
+@lru_cache(maxsize=1)
+def _get_chardet():
+    """延迟导入chardet，导入失败时返回None"""
+    try:
+        import chardet
+        return chardet
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _mime_for_ext(ext: str) -> Optional[str]:
+    """按（小写）扩展名查询MIME类型，结果缓存"""
+    if not ext:
+        return None
+    return mimetypes.types_map.get(ext) or mimetypes.guess_type('x' + ext)[0]
+
+
+def _copy_nested(value: Any) -> Any:
+    """递归复制字典/列表，字符串等不可变值（如文件内容）共享引用"""
+    if isinstance(value, dict):
+        return {key: _copy_nested(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_nested(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=4096)
+def _long_path(p: str) -> str:
+    """返回Windows长路径形式（避免 RUNNER~1 等短名），结果按路径缓存"""
+    if _GetLongPathNameW is not None:
+        buf_len = 260
+        while True:
+            buf = ctypes.create_unicode_buffer(buf_len)
+            r = _GetLongPathNameW(p, buf, buf_len)
+            if r == 0:
+                break
+            if r > buf_len:
+                buf_len = r
+                continue
+            p = buf.value
+            break
+    return os.path.normpath(p)
+
 
 class FileResolver:
     """
@@ -57,6 +143,7 @@ class FileResolver:
     DEFAULT_RESOLVE_OPTIONS = {
         'max_size': 100 * 1024 * 1024,  # 100MB
         'validate_type': True,            # 验证文件类型
+        'deep_type': True,                # 类型识别包含MIME和文件头检测
         'detect_encoding': True,          # 检测编码
         'read_content': False,            # 不读取内容（默认）
         'encoding_priority': [            # 编码检测优先级
@@ -65,6 +152,11 @@ class FileResolver:
         'enable_logging': True,           # 启用日志记录
         'cache_enabled': True             # 启用缓存
     }
+
+    # 解析结果缓存上限及可缓存内容的最大文件大小
+    CACHE_MAX_ENTRIES = 512
+    CACHE_CONTENT_MAX_BYTES = 1024 * 1024
+    ENCODING_CACHE_MAX_ENTRIES = 4096
     
     def __init__(self, config_manager: Optional[ConfigManager] = None):
         """
@@ -78,6 +170,12 @@ class FileResolver:
         
         # 加载文件类型配置
         self.file_types_config = self.config_manager.load_file_types_config()
+
+        # 扩展名 -> (类型名, 类型配置) 索引，配置文件变更时重建
+        self._ext_to_type_info: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._fallback_type_info: Optional[Tuple[str, Dict[str, Any]]] = None
+        self._type_index_stamp: Optional[int] = None
+        self._build_type_index()
         
         # 初始化MIME类型映射
         mimetypes.init()
@@ -102,10 +200,20 @@ class FileResolver:
             b'{\r\n': 'application/json',
             b'#!': 'text/script',
         }
-        self._cache: Dict[str, Dict[str, Any]] = OrderedDict()
+        # 按首字节分桶的签名索引
+        self._sig_by_first_byte: Dict[int, List[Tuple[bytes, str]]] = {}
+        self._build_signature_index()
+        # 解析结果LRU缓存，键为 (路径, mtime_ns, size, 选项)
+        self._cache: Dict[Tuple, Dict[str, Any]] = OrderedDict()
+        self._cache_max = self.CACHE_MAX_ENTRIES
 
-        # 编码缓存，减少重复检测
-        self._encoding_cache: Dict[str, Dict[str, Any]] = {}
+        # 编码LRU缓存，键为 (路径, mtime_ns, size)，文件变化后自动失效
+        self._encoding_cache: Dict[Tuple, Dict[str, Any]] = OrderedDict()
+        self._encoding_cache_max = self.ENCODING_CACHE_MAX_ENTRIES
+        # (编码优先级, 类型编码) -> 编码尝试顺序
+        self._encoding_order_cache: Dict[Tuple, Tuple[str, ...]] = {}
+        # 批量解析时多线程共享缓存，LRU的读改写需要加锁
+        self._cache_lock = threading.Lock()
     
     def is_available(self) -> bool:
         """用于测试/监控：当前解析器是否具备关键依赖。"""
@@ -122,49 +230,139 @@ class FileResolver:
         Returns:
             解析结果字典
         """
+        return self._resolve(file_path, options)
+
+    def resolve_many(self, paths, options: Optional[Dict[str, Any]] = None,
+                     max_workers: int = 8) -> Dict[str, Dict[str, Any]]:
+        """
+        批量解析文件路径（用于目录列表等场景）
+        
+        同一目录下的多个文件通过一次 os.scandir 获取stat信息，
+        文件头读取和编码检测在线程池中并行执行。
+        
+        Args:
+            paths: 文件路径序列
+            options: 解析选项（对所有文件相同）
+            max_workers: 最大工作线程数
+            
+        Returns:
+            输入路径字符串到解析结果字典的映射
+        """
+        paths = [os.fspath(p) for p in paths]
+        if not paths:
+            return {}
+        
+        # 按父目录分组，兄弟文件共用一次目录扫描
+        groups: Dict[str, List[str]] = {}
+        for p in paths:
+            groups.setdefault(os.path.dirname(os.path.abspath(p)), []).append(p)
+        prestats: Dict[str, os.stat_result] = {}
+        for parent, members in groups.items():
+            if len(members) < 2:
+                continue
+            wanted = {os.path.basename(p): p for p in members}
+            try:
+                with os.scandir(parent) as it:
+                    for entry in it:
+                        p = wanted.get(entry.name)
+                        if p is not None:
+                            try:
+                                prestats[p] = entry.stat()
+                            except OSError:
+                                pass
+            except OSError as e:
+                self.logger.debug(f"目录扫描失败: {parent}: {e}")
+        
+        def work(p: str) -> Dict[str, Any]:
+            return self._resolve(p, options, prestats.get(p))
+        
+        workers = max(1, min(max_workers, len(paths)))
+        if workers == 1:
+            return {p: work(p) for p in paths}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(paths, executor.map(work, paths)))
+
+    def _resolve(self, file_path: Union[str, Path], options: Optional[Dict[str, Any]],
+                 prestat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """resolve_file_path 的实现；prestat 为已获取的stat结果（如来自 os.scandir）"""
         try:
             # 标准化路径
             file_path = Path(file_path).resolve()
+            path_str = os.fspath(file_path)
+            ext = _ext_of(path_str)
             
             # 合并选项
             merged_options = self._merge_resolve_options(options)
-            
-            # 验证路径
-            validation_result = self._validate_path_with_options(file_path, merged_options)
+
+            # 验证路径（单次stat，结果供后续步骤复用）
+            validation_result, st = self._validate_path_with_options(file_path, merged_options, prestat)
             if not validation_result['valid']:
                 return self._create_error_result(
                     validation_result['error_type'],
                     validation_result['error_message'],
-                    str(file_path)
+                    path_str
                 )
+
+            # 命中缓存时直接返回（文件未修改、文件类型配置未修改且选项相同）
+            cache_key = None
+            if merged_options.get('cache_enabled', True):
+                try:
+                    cache_key = (path_str, st.st_mtime_ns, st.st_size,
+                                 self._file_types_config_stamp(),
+                                 self._freeze_options(merged_options))
+                except TypeError:
+                    cache_key = None
+                if cache_key is not None:
+                    cached = self._result_cache_get(cache_key)
+                    if cached is not None:
+                        hit = self._copy_result(cached)
+                        hit['resolved_at'] = self._get_timestamp()
+                        return hit
             
             # 获取文件信息
-            file_info = self._get_file_info(file_path)
+            file_info = self._get_file_info(file_path, st, ext)
             if 'error' in file_info:
                 return self._create_error_result(
                     'FILE_INFO_ERROR',
                     file_info['error'],
-                    str(file_path)
+                    path_str
                 )
             
+            # 一次性读取文件头部（需要读取内容且文件不大时读取整个文件），
+            # 供文件头识别、编码检测和内容解码共用
+            deep_type = merged_options.get('validate_type', True) and merged_options.get('deep_type', True)
+            head, head_complete = None, False
+            if deep_type or merged_options.get('detect_encoding', True) or merged_options.get('read_content', False):
+                head, head_complete = self._read_head(file_path, st.st_size, merged_options)
+            
             # 分析文件类型
-            file_type = self._analyze_file_type(file_path)
+            file_type = self._analyze_file_type(
+                file_path, head,
+                ext=ext,
+                deep=deep_type,
+                validate=merged_options.get('validate_type', True)
+            )
             if 'error' in file_type:
                 return self._create_error_result(
                     'FILE_TYPE_ERROR',
                     file_type['error'],
-                    str(file_path)
+                    path_str
                 )
             
             # 检测编码
             encoding_info = None
             if merged_options.get('detect_encoding', True):
-                encoding_info = self._detect_encoding(file_path)
+                encoding_info = self._detect_encoding(file_path, head, head_complete)
             
             # 读取文件内容（如果需要）
             content = None
             if merged_options.get('read_content', False):
-                content_result = self._read_file_content_with_encoding(file_path, encoding_info, merged_options)
+                content_result = self._read_file_content_with_encoding(
+                    file_path, encoding_info, merged_options,
+                    raw=head if head_complete else None,
+                    st=st,
+                    ext=ext
+                )
                 if content_result['success']:
                     content = content_result['content']
                     encoding_info = {'encoding': content_result['encoding']}
@@ -172,13 +370,13 @@ class FileResolver:
                     return self._create_error_result(
                         'CONTENT_READ_FAILED',
                         content_result['error'],
-                        str(file_path)
+                        path_str
                     )
             
             # 构建成功结果
             result = {
                 'success': True,
-                'file_path': self._normalize_path(file_path),
+                'file_path': self._normalize_path(path_str),
                 'file_info': file_info,
                 'file_type': file_type,
                 'encoding': encoding_info or {},
@@ -187,6 +385,10 @@ class FileResolver:
             
             if content is not None:
                 result['content'] = content
+
+            if cache_key is not None and (content is None or cache_key[2] <= self.CACHE_CONTENT_MAX_BYTES):
+                self._result_cache_put(cache_key, result)
+                return self._copy_result(result)
             
             return result
             
@@ -195,9 +397,56 @@ class FileResolver:
             return self._create_error_result(
                 'UNKNOWN_ERROR',
                 f"文件路径解析失败: {e}",
-                str(file_path) if 'file_path' in locals() else str(file_path)
+                str(file_path)
             )
 
+    @staticmethod
+    def _freeze_options(options: Dict[str, Any]) -> frozenset:
+        """将解析选项转换为可哈希的形式，用作缓存键"""
+        return frozenset(
+            (key, tuple(value) if isinstance(value, list) else value)
+            for key, value in options.items()
+        )
+
+    @staticmethod
+    def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """复制缓存结果（递归复制嵌套的字典/列表），避免调用方修改污染缓存"""
+        return _copy_nested(result)
+
+    def clear_cache(self) -> None:
+        """清空解析结果缓存和编码缓存"""
+        with self._cache_lock:
+            self._cache.clear()
+            self._encoding_cache.clear()
+
+    def _read_head(self, file_path: Path, size: int,
+                   options: Dict[str, Any]) -> Tuple[Optional[bytes], bool]:
+        """
+        读取文件头部字节
+        
+        Returns:
+            (读取的字节, 是否已覆盖整个文件)；读取失败时返回 (None, False)
+        """
+        if options.get('read_content', False) and size <= self.INLINE_READ_MAX_BYTES:
+            limit = size
+        else:
+            limit = min(size, self.ENCODING_SAMPLE_SIZE)
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(limit)
+        except OSError as e:
+            self.logger.debug(f"读取文件头部失败: {e}")
+            return None, False
+        return head, len(head) >= size
+
+    @staticmethod
+    def _decode_text(raw: bytes, encoding: str, errors: str = 'strict') -> str:
+        """按文本模式读取的语义解码字节（包括通用换行符转换）"""
+        text = raw.decode(encoding, errors)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+
     def _merge_resolve_options(self, options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """合并用户选项和默认选项"""
         if options is None:
@@ -207,57 +456,60 @@ class FileResolver:
         merged_options.update(options)
         return merged_options
     
-    def _normalize_path(self, file_path: Path) -> str:
+    def _normalize_path(self, file_path: Union[str, Path]) -> str:
+        path_str = os.fspath(file_path)
         try:
             # Windows 返回长路径（避免 RUNNER~1），其他平台返回规范化字符串
-            if os.name == 'nt':
-                return self._normalize_path_windows(file_path)
-            return os.path.normpath(str(file_path))
+            if _IS_WIN:
+                return self._normalize_path_windows(path_str)
+            return os.path.normpath(path_str)
         except Exception:
-            return str(file_path)
+            return path_str
 
-    def _normalize_path_windows(self, file_path: Path) -> str:
+    def _normalize_path_windows(self, file_path: Union[str, Path]) -> str:
+        path_str = os.fspath(file_path)
         try:
-            p = str(file_path)
-            GetLongPathNameW = ctypes.windll.kernel32.GetLongPathNameW
-            GetLongPathNameW.argtypes = [wintypes.LPCWSTR, wintypes.LPWSTR, wintypes.DWORD]
-            GetLongPathNameW.restype = wintypes.DWORD
-            buf_len = 260
-            while True:
-                buf = ctypes.create_unicode_buffer(buf_len)
-                r = GetLongPathNameW(p, buf, buf_len)
-                if r == 0:
-                    break
-                if r > buf_len:
-                    buf_len = r
-                    continue
-                p = buf.value
-                break
-            return os.path.normpath(p)
+            return _long_path(path_str)
         except Exception:
-            return os.path.normpath(str(file_path))
+            return os.path.normpath(path_str)
     
-    def _validate_path_with_options(self, file_path: Path, options: Dict[str, Any]) -> Dict[str, Any]:
-        """使用选项验证文件路径"""
+    def _validate_path_with_options(
+        self, file_path: Path, options: Dict[str, Any],
+        st: Optional[os.stat_result] = None
+    ) -> Tuple[Dict[str, Any], Optional[os.stat_result]]:
+        """
+        使用选项验证文件路径
+
+        Args:
+            file_path: 文件路径
+            options: 解析选项
+            st: 已获取的stat结果，为None时执行stat
+
+        Returns:
+            (验证结果字典, stat结果)；验证失败时stat结果可能为None
+        """
         try:
-            # 检查路径是否存在
-            if not file_path.exists():
+            # 单次stat同时判断存在性、类型和大小
+            try:
+                if st is None:
+                    st = file_path.stat()
+            except (FileNotFoundError, NotADirectoryError):
                 return {
                     'valid': False,
                     'error_type': 'FILE_NOT_FOUND',
                     'error_message': f"文件不存在: {file_path}"
-                }
+                }, None
             
             # 检查是否为文件
-            if not file_path.is_file():
+            if not stat.S_ISREG(st.st_mode):
                 return {
                     'valid': False,
                     'error_type': 'FILE_IS_DIRECTORY',
                     'error_message': f"路径是目录而非文件: {file_path}"
-                }
+                }, st
             
             # 检查文件大小
-            file_size = file_path.stat().st_size
+            file_size = st.st_size
             max_size = options.get('max_size', self.DEFAULT_RESOLVE_OPTIONS['max_size'])
             
             if file_size > max_size:
@@ -265,7 +517,7 @@ class FileResolver:
                     'valid': False,
                     'error_type': 'FILE_TOO_LARGE',
                     'error_message': f"文件过大: {file_path} ({self._format_file_size(file_size)})"
-                }
+                }, st
             
             # 检查文件权限
             if not os.access(file_path, os.R_OK):
@@ -273,31 +525,44 @@ class FileResolver:
                     'valid': False,
                     'error_type': 'PERMISSION_DENIED',
                     'error_message': f"权限不足，无法访问: {file_path}"
-                }
+                }, st
             
-            return {'valid': True}
+            return {'valid': True}, st
             
         except Exception as e:
             return {
                 'valid': False,
                 'error_type': 'UNKNOWN_ERROR',
                 'error_message': f"路径验证失败: {e}"
-            }
+            }, None
     
     def _read_file_content_with_encoding(
         self, 
         file_path: Path, 
         encoding_info: Optional[Dict[str, Any]], 
-        options: Dict[str, Any]
+        options: Dict[str, Any],
+        raw: Optional[bytes] = None,
+        st: Optional[os.stat_result] = None,
+        ext: Optional[str] = None
     ) -> Dict[str, Any]:
-        """使用编码信息读取文件内容"""
+        """使用编码信息读取文件内容（提供完整的raw字节时直接在内存中解码）"""
+        def read_text(encoding: str, errors: str = 'strict') -> str:
+            if raw is not None:
+                return self._decode_text(raw, encoding, errors)
+            with open(file_path, 'r', encoding=encoding, errors=errors) as f:
+                return f.read()
+
         try:
+            if st is None:
+                st = file_path.stat()
+            cache_key = (os.fspath(file_path), st.st_mtime_ns, st.st_size)
+
             # 如果已有编码信息，直接使用
-            type_options = self._get_file_type_options(file_path)
+            type_options = self._get_file_type_options(file_path, ext)
             type_encoding = type_options.get('encoding') if type_options else None
 
             if not encoding_info or not encoding_info.get('encoding'):
-                cached = self._encoding_cache.get(str(file_path))
+                cached = self._encoding_cache_get(cache_key)
                 if cached:
                     encoding_info = cached
                 elif type_encoding:
@@ -306,13 +571,13 @@ class FileResolver:
                         'confidence': 1.0,
                         'method': 'type_config'
                     }
-                    self._encoding_cache[str(file_path)] = encoding_info
+                    self._encoding_cache_put(cache_key, encoding_info)
 
+            failed_encoding = None
             if encoding_info and encoding_info.get('encoding'):
                 try:
-                    with open(file_path, 'r', encoding=encoding_info['encoding']) as f:
-                        content = f.read()
-                    self._encoding_cache[str(file_path)] = encoding_info
+                    content = read_text(encoding_info['encoding'])
+                    self._encoding_cache_put(cache_key, encoding_info)
                     return {
                         'success': True,
                         'content': content,
@@ -320,17 +585,22 @@ class FileResolver:
                     }
                 except UnicodeDecodeError:
                     self.logger.warning(f"使用检测到的编码读取失败，尝试其他编码")
-                    self._encoding_cache.pop(str(file_path), None)
+                    with self._cache_lock:
+                        self._encoding_cache.pop(cache_key, None)
+                    failed_encoding = encoding_info['encoding'].lower()
 
-            encodings = options.get('encoding_priority', self.DEFAULT_RESOLVE_OPTIONS['encoding_priority'])
-            if type_encoding and type_encoding not in encodings:
-                encodings = [type_encoding] + encodings
+            encodings = self._encoding_trial_order(
+                options.get('encoding_priority', self.DEFAULT_RESOLVE_OPTIONS['encoding_priority']),
+                type_encoding
+            )
 
             for encoding in encodings:
+                if encoding.lower() == failed_encoding:
+                    # 已确认无法解码，不再重复尝试
+                    continue
                 try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    self._encoding_cache[str(file_path)] = {'encoding': encoding, 'method': 'priority'}
+                    content = read_text(encoding)
+                    self._encoding_cache_put(cache_key, {'encoding': encoding, 'method': 'priority'})
                     return {
                         'success': True,
                         'content': content,
@@ -344,9 +614,8 @@ class FileResolver:
             
             if type_encoding:
                 try:
-                    with open(file_path, 'r', encoding=type_encoding, errors='replace') as f:
-                        content = f.read()
-                    self._encoding_cache[str(file_path)] = {'encoding': type_encoding, 'method': 'fallback'}
+                    content = read_text(type_encoding, errors='replace')
+                    self._encoding_cache_put(cache_key, {'encoding': type_encoding, 'method': 'fallback'})
                     return {
                         'success': True,
                         'content': content,
@@ -366,6 +635,51 @@ class FileResolver:
                 'error': f"文件读取失败: {e}"
             }
     
+    def _encoding_trial_order(self, encodings, type_encoding: Optional[str]) -> Tuple[str, ...]:
+        """返回编码尝试顺序（类型配置编码优先），按输入缓存避免每次重建列表"""
+        key = (tuple(encodings), type_encoding)
+        order = self._encoding_order_cache.get(key)
+        if order is None:
+            order = key[0]
+            if type_encoding and type_encoding not in order:
+                order = (type_encoding,) + order
+            self._encoding_order_cache[key] = order
+        return order
+
+    def _result_cache_get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """读取解析结果缓存并刷新LRU顺序"""
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+            return result
+
+    def _result_cache_put(self, key: Tuple, result: Dict[str, Any]) -> None:
+        """写入解析结果缓存，超出上限时淘汰最久未使用的条目"""
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_max:
+                self._cache.popitem(last=False)
+
+    def _encoding_cache_get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """读取编码缓存并刷新LRU顺序"""
+        with self._cache_lock:
+            cache = self._encoding_cache
+            info = cache.get(key)
+            if info is not None:
+                cache.move_to_end(key)
+            return info
+
+    def _encoding_cache_put(self, key: Tuple, info: Dict[str, Any]) -> None:
+        """写入编码缓存，超出上限时淘汰最久未使用的条目"""
+        with self._cache_lock:
+            cache = self._encoding_cache
+            cache[key] = info
+            cache.move_to_end(key)
+            if len(cache) > self._encoding_cache_max:
+                cache.popitem(last=False)
+
     def _create_error_result(self, error_type: str, error_message: str, file_path: str) -> Dict[str, Any]:
         """创建错误结果"""
         return {
@@ -378,26 +692,30 @@ class FileResolver:
     
 
     
-    def _get_file_info(self, file_path: Path) -> Dict[str, Any]:
+    def _get_file_info(self, file_path: Path, st: Optional[os.stat_result] = None,
+                       ext: Optional[str] = None) -> Dict[str, Any]:
         """
         获取文件基本信息
         
         Args:
             file_path: 文件路径
+            st: 已获取的stat结果，为None时重新stat
+            ext: 已计算的小写扩展名，为None时从路径计算
             
         Returns:
             文件信息字典
         """
         try:
-            stat = file_path.stat()
+            if st is None:
+                st = file_path.stat()
             
             return {
                 'name': file_path.name,
-                'extension': file_path.suffix.lower(),
-                'size': stat.st_size,
-                'size_formatted': self._format_file_size(stat.st_size),
-                'modified_time': stat.st_mtime,
-                'created_time': stat.st_ctime,
+                'extension': ext if ext is not None else _ext_of(os.fspath(file_path)),
+                'size': st.st_size,
+                'size_formatted': self._format_file_size(st.st_size),
+                'modified_time': st.st_mtime,
+                'created_time': st.st_ctime,
                 'is_readable': os.access(file_path, os.R_OK),
                 'is_writable': os.access(file_path, os.W_OK),
                 'is_executable': os.access(file_path, os.X_OK)
@@ -407,27 +725,45 @@ class FileResolver:
             self.logger.error(f"获取文件信息失败: {e}")
             return {'error': str(e)}
     
-    def _analyze_file_type(self, file_path: Path) -> Dict[str, Any]:
+    def _analyze_file_type(self, file_path: Path, header: Optional[bytes] = None,
+                           ext: Optional[str] = None,
+                           deep: bool = True, validate: bool = True) -> Dict[str, Any]:
         """
         分析文件类型
         
         Args:
             file_path: 文件路径
+            header: 已读取的文件头部字节，为None时从文件读取
+            ext: 已计算的小写扩展名，为None时从路径计算
+            deep: 是否进行MIME和文件头检测，否则仅按扩展名识别
+            validate: 为False时只返回扩展名及其映射的类型
             
         Returns:
             文件类型信息字典
         """
         try:
-            extension = file_path.suffix.lower()
+            extension = ext if ext is not None else _ext_of(os.fspath(file_path))
             
             # 1. 基于扩展名的类型识别
             extension_type = self._get_type_by_extension(extension)
+            if not validate:
+                return {
+                    'extension': extension,
+                    'extension_type': extension_type,
+                    'final_type': extension_type['name'] if extension_type else 'unknown'
+                }
             
-            # 2. 基于MIME类型的识别
-            mime_type = mimetypes.guess_type(str(file_path))[0]
-            
-            # 3. 基于文件头的识别
-            header_type = self._get_type_by_header(file_path)
+            mime_type = None
+            header_type = None
+            if deep:
+                # 2. 基于MIME类型的识别
+                mime_type = _mime_for_ext(extension)
+                
+                # 3. 基于文件头的识别
+                if header is not None:
+                    header_type = self._get_type_by_header_bytes(header)
+                else:
+                    header_type = self._get_type_by_header(file_path)
             
             # 4. 确定最终类型
             final_type = self._determine_final_type(extension_type, mime_type, header_type)
@@ -445,6 +781,43 @@ class FileResolver:
             self.logger.error(f"文件类型分析失败: {e}")
             return {'error': str(e)}
     
+    def _file_types_config_stamp(self) -> Optional[int]:
+        """返回文件类型配置文件的修改时间戳，无法获取时返回None"""
+        config_dir = getattr(self.config_manager, 'config_dir', None)
+        if config_dir is None:
+            return None
+        try:
+            return os.stat(os.path.join(config_dir, "file_types.json")).st_mtime_ns
+        except (OSError, TypeError):
+            return None
+
+    def _build_type_index(self) -> None:
+        """根据 file_types_config 构建扩展名索引和兜底类型"""
+        ext_index: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        fallback = None
+        for type_name, type_info in self.file_types_config.items():
+            if fallback is None and type_info.get('include_else'):
+                fallback = (type_name, type_info)
+            for ext in type_info.get('extensions', []):
+                # 与原线性扫描一致：先出现的类型优先
+                ext_index.setdefault(ext, (type_name, type_info))
+        self._ext_to_type_info = ext_index
+        self._fallback_type_info = fallback
+        self._type_index_stamp = self._file_types_config_stamp()
+
+    def _refresh_type_index(self) -> None:
+        """配置文件发生变化时重新加载配置并重建索引（保持实时刷新语义）"""
+        stamp = self._file_types_config_stamp()
+        if stamp is not None and stamp == self._type_index_stamp:
+            return
+        self.file_types_config = self.config_manager.load_file_types_config()
+        self._build_type_index()
+
+    def _lookup_type(self, extension: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """按扩展名查找类型，未命中时返回兜底类型"""
+        self._refresh_type_index()
+        return self._ext_to_type_info.get(extension) or self._fallback_type_info
+
     def _get_type_by_extension(self, extension: str) -> Optional[Dict[str, Any]]:
         """
         基于扩展名获取文件类型信息
@@ -455,40 +828,23 @@ class FileResolver:
         Returns:
             文件类型信息字典
         """
-        self.file_types_config = self.config_manager.load_file_types_config()
-        fallback_type = None
-        for type_name, type_info in self.file_types_config.items():
-            if type_info.get('include_else') and fallback_type is None:
-                fallback_type = {
-                    'name': type_name,
-                    'renderer': type_info.get('renderer'),
-                    'preview_mode': type_info.get('preview_mode'),
-                    'icon': type_info.get('icon'),
-                    'description': type_info.get('description'),
-                    'encoding': type_info.get('encoding')
-                }
-            if extension in type_info.get('extensions', []):
-                return {
-                    'name': type_name,
-                    'renderer': type_info.get('renderer'),
-                    'preview_mode': type_info.get('preview_mode'),
-                    'icon': type_info.get('icon'),
-                    'description': type_info.get('description'),
-                    'encoding': type_info.get('encoding')
-                }
-        return fallback_type
+        entry = self._lookup_type(extension)
+        if entry is None:
+            return None
+        type_name, type_info = entry
+        return {
+            'name': type_name,
+            'renderer': type_info.get('renderer'),
+            'preview_mode': type_info.get('preview_mode'),
+            'icon': type_info.get('icon'),
+            'description': type_info.get('description'),
+            'encoding': type_info.get('encoding')
+        }
 
-    def _get_file_type_options(self, file_path: Path) -> Dict[str, Any]:
+    def _get_file_type_options(self, file_path: Path, ext: Optional[str] = None) -> Dict[str, Any]:
         """获取文件类型配置详情（含编码等扩展参数）。"""
-        extension = file_path.suffix.lower()
-        self.file_types_config = self.config_manager.load_file_types_config()
-        for _, type_info in self.file_types_config.items():
-            if extension in type_info.get('extensions', []):
-                return type_info
-        for type_name, type_info in self.file_types_config.items():
-            if type_info.get('include_else'):
-                return type_info
-        return {}
+        entry = self._lookup_type(ext if ext is not None else _ext_of(os.fspath(file_path)))
+        return entry[1] if entry is not None else {}
     
     def _get_type_by_header(self, file_path: Path) -> Optional[str]:
         """
@@ -503,15 +859,33 @@ class FileResolver:
         try:
             with open(file_path, 'rb') as f:
                 header = f.read(16)  # 读取前16字节
-                
-                for signature, mime_type in self.file_signatures.items():
-                    if header.startswith(signature):
-                        return mime_type
+            return self._get_type_by_header_bytes(header)
                         
         except Exception as e:
             self.logger.debug(f"文件头分析失败: {e}")
             
         return None
+
+    def _build_signature_index(self) -> None:
+        """按首字节对 file_signatures 分桶，桶内按签名长度降序（最长匹配优先）"""
+        index: Dict[int, List[Tuple[bytes, str]]] = {}
+        for signature, mime_type in self.file_signatures.items():
+            if signature:
+                index.setdefault(signature[0], []).append((signature, mime_type))
+        for bucket in index.values():
+            bucket.sort(key=lambda item: -len(item[0]))
+        self._sig_by_first_byte = index
+
+    def _get_type_by_header_bytes(self, header: bytes) -> Optional[str]:
+        """基于已读取的文件头字节获取MIME类型"""
+        if not header:
+            return None
+        bucket = self._sig_by_first_byte.get(header[0])
+        if bucket:
+            for signature, mime_type in bucket:
+                if header.startswith(signature):
+                    return mime_type
+        return None
     
     def _determine_final_type(self, extension_type: Optional[Dict], 
                             mime_type: Optional[str], 
@@ -562,12 +936,15 @@ class FileResolver:
             
         return min(confidence, 1.0)
     
-    def _detect_encoding(self, file_path: Path) -> Dict[str, Any]:
+    def _detect_encoding(self, file_path: Path, raw: Optional[bytes] = None,
+                         raw_complete: bool = False) -> Dict[str, Any]:
         """
         检测文件编码
         
         Args:
             file_path: 文件路径
+            raw: 已读取的文件头部字节
+            raw_complete: raw是否已覆盖整个文件
             
         Returns:
             编码信息字典
@@ -575,9 +952,9 @@ class FileResolver:
         try:
             # 尝试使用chardet检测编码
             if CHARDET_AVAILABLE:
-                return self._detect_encoding_with_chardet(file_path)
+                return self._detect_encoding_with_chardet(file_path, raw, raw_complete)
             else:
-                return self._detect_encoding_basic(file_path)
+                return self._detect_encoding_basic(file_path, raw, raw_complete)
                 
         except Exception as e:
             self.logger.error(f"编码检测失败: {e}")
@@ -587,48 +964,133 @@ class FileResolver:
                 'error': str(e)
             }
     
-    def _detect_encoding_with_chardet(self, file_path: Path) -> Dict[str, Any]:
+    # 快速编码嗅探的采样大小；chardet增量检测的分块大小与读取上限
+    ENCODING_SAMPLE_SIZE = 4096
+    CHARDET_CHUNK_SIZE = 16 * 1024
+    CHARDET_MAX_BYTES = 1024 * 1024
+    # 需要读取内容时整文件一次读入内存的大小上限，超过时按需重新打开
+    INLINE_READ_MAX_BYTES = 8 * 1024 * 1024
+
+    @staticmethod
+    def _sniff_encoding(sample: bytes, complete: bool) -> Optional[Dict[str, Any]]:
+        """
+        基于BOM/ASCII/UTF-8校验的快速编码判断
+        
+        Args:
+            sample: 文件开头的采样字节
+            complete: 采样是否已覆盖整个文件
+            
+        Returns:
+            编码信息字典，无法确定时返回None
+        """
+        if sample[:1] in _BOM_LEADS:
+            for bom, encoding in _BOMS:
+                if sample.startswith(bom):
+                    return {'encoding': encoding, 'confidence': 1.0, 'method': 'bom'}
+        # bytes.isascii / bytes.decode 均在C层完成，无需逐字节Python循环
+        if sample.isascii():
+            return {'encoding': 'utf-8', 'confidence': 0.99, 'method': 'ascii'}
+        try:
+            if complete:
+                sample.decode('utf-8')
+            else:
+                # 增量解码器容忍采样末尾被截断的多字节字符
+                _Utf8IncrementalDecoder().decode(sample, final=False)
+        except UnicodeDecodeError:
+            return None
+        return {'encoding': 'utf-8', 'confidence': 0.9, 'method': 'utf8-sample'}
+
+    def _detect_encoding_with_chardet(self, file_path: Path, raw: Optional[bytes] = None,
+                                      raw_complete: bool = False) -> Dict[str, Any]:
         """
-        使用chardet库检测编码
+        使用chardet库检测编码（BOM/ASCII/UTF-8 可快速判定时不调用chardet）
         
         Args:
             file_path: 文件路径
+            raw: 已读取的文件头部字节
+            raw_complete: raw是否已覆盖整个文件
             
         Returns:
             编码信息字典
         """
         try:
-            with open(file_path, 'rb') as f:
-                raw_data = f.read(1024 * 1024)  # 读取1MB用于检测
-                
-            result = chardet.detect(raw_data)
+            sample_size = self.ENCODING_SAMPLE_SIZE
+            if raw is not None:
+                sample = raw[:sample_size]
+                quick = self._sniff_encoding(sample, raw_complete and len(raw) <= sample_size)
+                if quick is not None:
+                    return quick
+            # 整个文件已在内存中时不再重新打开
+            source = io.BytesIO(raw) if raw is not None and raw_complete else open(file_path, 'rb')
+            with source as f:
+                if raw is None:
+                    sample = f.read(sample_size)
+                    quick = self._sniff_encoding(sample, len(sample) < sample_size)
+                    if quick is not None:
+                        return quick
+                else:
+                    f.seek(len(sample))
+
+                # 分块增量检测，检测器确定后提前结束，最多读取1MB
+                chardet = _get_chardet()
+                if chardet is None:
+                    return self._detect_encoding_basic(file_path, raw, raw_complete)
+                detector = chardet.UniversalDetector()
+                detector.feed(sample)
+                fed = len(sample)
+                while not detector.done and fed < self.CHARDET_MAX_BYTES:
+                    chunk = f.read(self.CHARDET_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    detector.feed(chunk)
+                    fed += len(chunk)
+            result = detector.close()
             
             return {
                 'encoding': result['encoding'],
                 'confidence': result['confidence'],
-                'method': 'chardet'
+                'method': 'chardet-incremental'
             }
             
         except Exception as e:
             self.logger.error(f"chardet编码检测失败: {e}")
-            return self._detect_encoding_basic(file_path)
+            return self._detect_encoding_basic(file_path, raw, raw_complete)
     
-    def _detect_encoding_basic(self, file_path: Path) -> Dict[str, Any]:
+    def _detect_encoding_basic(self, file_path: Path, raw: Optional[bytes] = None,
+                               raw_complete: bool = False) -> Dict[str, Any]:
         """
-        基本编码检测方法
+        基本编码检测方法（读取一次采样，在内存中依次尝试解码）
         
         Args:
             file_path: 文件路径
+            raw: 已读取的文件头部字节
+            raw_complete: raw是否已覆盖整个文件
             
         Returns:
             编码信息字典
         """
         encodings = ['utf-8', 'gbk', 'gb2312', 'latin-1', 'cp1252']
+        sample_size = self.ENCODING_SAMPLE_SIZE
+        
+        if raw is None:
+            try:
+                with open(file_path, 'rb') as f:
+                    raw = f.read(sample_size)
+                raw_complete = len(raw) < sample_size
+            except OSError as e:
+                self.logger.debug(f"编码检测读取失败: {e}")
+                return {
+                    'encoding': 'unknown',
+                    'confidence': 0.0,
+                    'method': 'basic'
+                }
+        sample = raw[:sample_size]
+        complete = raw_complete and len(raw) <= sample_size
         
         for encoding in encodings:
             try:
-                with open(file_path, 'r', encoding=encoding) as f:
-                    f.read(1024)  # 尝试读取一小部分
+                # 增量解码器容忍采样末尾被截断的多字节字符
+                codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
                 return {
                     'encoding': encoding,
                     'confidence': 0.8,
@@ -659,13 +1121,11 @@ class FileResolver:
         if size_bytes == 0:
             return "0 B"
         
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
-        
-        return f"{size_bytes:.1f} {size_names[i]}"
+        # 由二进制位数直接得到单位下标：[1024^i, 1024^(i+1)) 对应 i
+        i = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_NAMES) - 1)
+        if i <= 0:
+            return f"{size_bytes:.1f} B"
+        return f"{size_bytes / (1 << (10 * i)):.1f} {_SIZE_NAMES[i]}"
     
     def _get_timestamp(self) -> str:
         """
@@ -698,6 +1158,11 @@ class FileResolver:
         """
         return ['utf-8', 'gbk', 'gb2312', 'latin-1', 'cp1252', 'ascii']
     
+    def _is_supported_ext(self, ext: str) -> bool:
+        """检查小写扩展名是否在类型配置中"""
+        self._refresh_type_index()
+        return ext in self._ext_to_type_info
+
     def is_supported_file(self, file_path: Union[str, Path]) -> bool:
         """
         检查文件是否被支持
@@ -709,14 +1174,9 @@ class FileResolver:
             是否支持该文件
         """
         try:
-            file_path = Path(file_path)
-            extension = file_path.suffix.lower()
-            
-            for type_info in self.file_types_config.values():
-                if extension in type_info.get('extensions', []):
-                    return True
-                    
-            return False
+            # 与 Path 一致地忽略末尾路径分隔符
+            path_str = os.fspath(file_path).rstrip(os.sep + (os.altsep or ''))
+            return self._is_supported_ext(_ext_of(path_str))
             
         except Exception as e:
             self.logger.error(f"文件支持检查失败: {e}")
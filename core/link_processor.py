@@ -9,49 +9,76 @@ link_processor.py - 接口伪实现（最小可导入版本）
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
-from enum import Enum
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import IntEnum, auto
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional, Protocol
-from urllib.parse import urlparse, unquote
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Optional, Protocol
+from urllib.parse import urlsplit, unquote
 import json
 import logging
 import os
+import re
+import stat
 from utils.config_manager import get_config_manager
 
-
-class LinkType(Enum):
-    ANCHOR = "ANCHOR"
-    EXTERNAL_HTTP = "EXTERNAL_HTTP"
-    RELATIVE_MD = "RELATIVE_MD"
-    FILE_PROTOCOL = "FILE_PROTOCOL"
-    IMAGE = "IMAGE"
-    MERMAID = "MERMAID"
-    TOC = "TOC"
-    DIRECTORY = "DIRECTORY"
-    UNKNOWN = "UNKNOWN"
-
-
-class ErrorCode(Enum):
-    OK = "OK"
-    RESOLVE_ERROR = "RESOLVE_ERROR"
-    NOT_FOUND = "NOT_FOUND"
-    PERMISSION_DENIED = "PERMISSION_DENIED"
-    SECURITY_BLOCKED = "SECURITY_BLOCKED"
-    UNSUPPORTED = "UNSUPPORTED"
-    INTERNAL_ERROR = "INTERNAL_ERROR"
-
-
-@dataclass
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib  # type: ignore
+    except ImportError:
+        tomllib = None  # type: ignore
+
+
+# IntEnum：成员哈希/比较走整数的C实现（Enum 的 __hash__ 为 Python 层按名称哈希），
+# 处理器分派与错误码比较更快；日志与快照统一使用 .name，不依赖取值
+class LinkType(IntEnum):
+    ANCHOR = auto()
+    EXTERNAL_HTTP = auto()
+    RELATIVE_MD = auto()
+    FILE_PROTOCOL = auto()
+    IMAGE = auto()
+    MERMAID = auto()
+    TOC = auto()
+    DIRECTORY = auto()
+    UNKNOWN = auto()
+
+    @classmethod
+    def from_name(cls, name: str) -> "LinkType":
+        """按名称（如 "ANCHOR"）取成员，兼容旧的字符串取值。"""
+        return cls[name]
+
+
+class ErrorCode(IntEnum):
+    OK = auto()
+    RESOLVE_ERROR = auto()
+    NOT_FOUND = auto()
+    PERMISSION_DENIED = auto()
+    SECURITY_BLOCKED = auto()
+    UNSUPPORTED = auto()
+    INTERNAL_ERROR = auto()
+
+    @classmethod
+    def from_name(cls, name: str) -> "ErrorCode":
+        """按名称（如 "NOT_FOUND"）取成员，兼容旧的字符串取值。"""
+        return cls[name]
+
+
+@dataclass(slots=True)
 class LinkContext:
     href: str
     current_file: Optional[Path] = None
     current_dir: Optional[Path] = None
     source_component: str = ""
-    extra: Dict[str, Any] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationResult:
     ok: bool
     error_code: Optional[ErrorCode] = None
@@ -59,7 +86,7 @@ class ValidationResult:
     details: Dict[str, Any] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class LinkResult:
     success: bool
     action: str = ""
@@ -68,46 +95,212 @@ class LinkResult:
     error_code: Optional[ErrorCode] = None
 
 
+@dataclass(frozen=True, slots=True)
+class LinkPolicy:
+    """规范化后的链接处理策略（加载时一次性构建，处理链接时按属性读取）。"""
+    enabled: bool = True
+    # fail-closed：默认检查存在性
+    check_exists: bool = True
+    check_acl: bool = False
+    external_links: bool = True
+    image_links: bool = True
+    mermaid_links: bool = True
+    file_protocol: bool = True
+    cache_enabled: bool = True
+    cache_size: int = 1000
+    error_handling: str = "strict"
+    # 链接快照批量提交条数；1 表示逐条立即保存
+    snapshot_batch_size: int = 1
+    windows_specific: Mapping[str, Any] = field(default_factory=dict)
+    security: Mapping[str, Any] = field(default_factory=dict)
+    logging: Mapping[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, policy: Optional[Dict[str, Any]]) -> "LinkPolicy":
+        """从字典策略构建；缺失的键取默认值，兼容 set_policy/validate 传入的部分策略。"""
+        policy = policy or {}
+        return cls(
+            enabled=policy.get("enabled", True),
+            check_exists=bool(policy.get("check_exists", True)),
+            check_acl=bool(policy.get("check_acl", False)),
+            external_links=policy.get("external_links", True),
+            image_links=policy.get("image_links", True),
+            mermaid_links=policy.get("mermaid_links", True),
+            file_protocol=policy.get("file_protocol", True),
+            cache_enabled=policy.get("cache_enabled", True),
+            cache_size=policy.get("cache_size", 1000),
+            error_handling=policy.get("error_handling", "strict"),
+            snapshot_batch_size=policy.get("snapshot_batch_size", 1),
+            windows_specific=policy.get("windows_specific"),
+            security=policy.get("security"),
+            logging=policy.get("logging"),
+        )
+
+    def __post_init__(self) -> None:
+        # 嵌套配置深拷贝为只读结构：调用方事后原地修改其字典不会影响已构建的策略
+        for name in ("windows_specific", "security", "logging"):
+            object.__setattr__(self, name, _freeze_policy_value(getattr(self, name) or {}))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """兼容旧的字典式读取。"""
+        return getattr(self, key, default)
+
+
+def _freeze_policy_value(value: Any) -> Any:
+    """递归复制并冻结策略值：映射 → 只读映射，列表/元组 → 元组，集合 → frozenset。
+
+    冻结结果可按内容比较（==），LinkValidator 用它作为字典策略的内容快照。
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze_policy_value(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze_policy_value(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+# 高频的固定结果共享同一实例（只读约定：调用方不得修改其字段，payload 为只读映射）
+_VALIDATION_OK = ValidationResult(ok=True)
+_UNSUPPORTED_RESULT = LinkResult(
+    success=False, action="", payload=MappingProxyType({}), message="Handler not implemented", error_code=ErrorCode.UNSUPPORTED
+)
+
+
 class ILinkHandler(Protocol):
     def handle(self, ctx: LinkContext, resolved: Any) -> LinkResult:  # pragma: no cover - 占位接口
         ...
 
 
+# 未设置策略的占位哨兵（区分“尚未设置”与显式传入的 None）
+_UNSET = object()
+
+# 识别规则用到的扩展名集合（不含点，小写）
+_IMAGE_EXTS = frozenset(('png', 'jpg', 'jpeg', 'gif', 'svg', 'webp'))
+_MERMAID_EXTS = frozenset(('mmd', 'mermaid'))
+# 首字符（小写） → (候选前缀, 链接类型)，避免对每个链接依次执行多次 startswith
+_PREFIX_RULES: Dict[str, tuple] = {
+    'm': (('mailto:',), LinkType.EXTERNAL_HTTP),
+    'h': (('http://', 'https://'), LinkType.EXTERNAL_HTTP),
+    'f': (('file:///',), LinkType.FILE_PROTOCOL),
+}
+
+
 class LinkTypeRecognizer:
-    """最小识别器占位：仅覆盖最简单规则，便于单测骨架运行。"""
+    """最小识别器占位：仅覆盖最简单规则，便于单测骨架运行。
+
+    识别结果按 (href, mermaid_container) 做有界LRU缓存，目录/导航页中重复的链接只需一次字典查找。
+    """
+
+    DEFAULT_CACHE_SIZE = 1000
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE) -> None:
+        self._cache: "OrderedDict[tuple, LinkType]" = OrderedDict()
+        self._cache_max = max(0, int(cache_size or 0))
 
     def recognize(self, href: str, context: LinkContext) -> LinkType:
+        if not self._cache_max:
+            return self._recognize_uncached(href, context)
+        extra = context.extra if context is not None else None
+        key = (href, bool(extra and extra.get("mermaid_container")))
+        cache = self._cache
+        link_type = cache.get(key)
+        if link_type is not None:
+            cache.move_to_end(key)
+            return link_type
+        link_type = self._recognize_uncached(href, context)
+        cache[key] = link_type
+        if len(cache) > self._cache_max:
+            cache.popitem(last=False)
+        return link_type
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def _recognize_uncached(self, href: str, context: LinkContext) -> LinkType:
         if not href:
             return LinkType.UNKNOWN
-        h = href.strip().lower()
-        if h.startswith('#'):
+        h = href.strip()
+        if not h:
+            # 纯空白链接仅可能由 mermaid 容器识别
+            return LinkType.MERMAID if (context.extra and context.extra.get("mermaid_container")) else LinkType.UNKNOWN
+        # 前缀判定：按首字符分派，仅对可能命中的前缀片段做小写化
+        first = h[0]
+        if first == '#':
             return LinkType.ANCHOR
-        if h.startswith('mailto:'):
-            return LinkType.EXTERNAL_HTTP  # 临时归为外链，交给外部处理器或专用处理器
-        if h.startswith('http://') or h.startswith('https://'):
-            return LinkType.EXTERNAL_HTTP
-        if h.startswith('file:///') or (len(h) > 2 and h[1] == ':' and ('\\' in h or '/' in h)):
+        prefix_type = _PREFIX_RULES.get(first.lower())
+        if prefix_type is not None:
+            prefixes, link_type = prefix_type
+            if h[:8].lower().startswith(prefixes):
+                return link_type  # mailto: 临时归为外链，交给外部处理器或专用处理器
+        if len(h) > 2 and h[1] == ':' and ('\\' in h or '/' in h):
             return LinkType.FILE_PROTOCOL
-        if h.endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp')):
+        # 后缀判定：只取最后一个点之后的扩展名并小写化一次
+        _, dot, ext = h.rpartition('.')
+        ext = ext.lower() if dot else ''
+        if ext in _IMAGE_EXTS:
             return LinkType.IMAGE
-        if h.endswith('.md') and not (h.startswith('http://') or h.startswith('https://')):
+        if ext == 'md':
             return LinkType.RELATIVE_MD
         # 简化的目录判定（骨架）：以斜杠结尾
-        if h.endswith('/') or h.endswith('\\'):
+        if h[-1] in '/\\':
             return LinkType.DIRECTORY
         # Mermaid图表识别（通过事件extra或文件扩展名）
         if context.extra and context.extra.get("mermaid_container"):
             return LinkType.MERMAID
-        if h.endswith(('.mmd', '.mermaid')):
+        if ext in _MERMAID_EXTS:
             return LinkType.MERMAID
-        # TOC目录项识别（包含#的链接）
-        if '#' in h and not h.startswith('#'):
+        # TOC目录项识别（包含#的链接，首字符已排除#）
+        if '#' in h:
             return LinkType.TOC
         return LinkType.UNKNOWN
 
 
+@lru_cache(maxsize=8192)
+def _normalized_path(path_str: str) -> Path:
+    """os.path.normpath 为纯函数，按字符串缓存标准化后的 Path（Path 不可变，可安全共享）。"""
+    return Path(os.path.normpath(path_str))
+
+
+@lru_cache(maxsize=1024)
+def _file_url_path(url: str) -> str:
+    """提取 file URL 的路径部分（未解码）。
+
+    常见的 file:/// 形式直接切片（netloc 为空，截掉查询与片段）；其余形式交给 urlsplit 兜底。
+    """
+    if url[:8].lower() == "file:///" and "\t" not in url and "\n" not in url and "\r" not in url:
+        end = len(url)
+        for sep in ("?", "#"):
+            idx = url.find(sep, 7, end)
+            if idx != -1:
+                end = idx
+        return url[7:end]
+    parsed = urlsplit(url)
+    if parsed.scheme != "file":
+        raise ValueError("URL scheme is not file")
+    return parsed.path or ""
+
+
 class PathResolver:
+    RESOLVE_CACHE_SIZE = 4096
+
+    def __init__(self) -> None:
+        # 按实例缓存 (当前文件, href) → 解析结果；新建 PathResolver 即可失效
+        self._resolve_cached = lru_cache(maxsize=self.RESOLVE_CACHE_SIZE)(self._resolve_relative_uncached)
+
     def resolve_relative(self, current_file: Path, href: str) -> Path:
+        """基于当前文件解析相对路径（带缓存）。
+
+        仅当前文件为绝对路径时缓存：为空或为相对路径时结果依赖工作目录，工作目录切换后缓存会过期。
+        """
+        if current_file is None:
+            return self._resolve_relative_uncached(None, href)
+        current_str = str(current_file)
+        if not os.path.isabs(current_str):
+            return self._resolve_relative_uncached(current_str, href)
+        return self._resolve_cached(current_str, href)
+
+    def _resolve_relative_uncached(self, current_file: Any, href: str) -> Path:
         """基于当前文件解析相对路径，并执行Windows风格标准化。
         - 当前文件为空时退化为基于当前工作目录解析
         - 绝对路径直接标准化返回
@@ -125,39 +318,23 @@ class PathResolver:
         except Exception:
             href = raw
 
-        # 绝对路径：直接标准化
-        candidate = Path(href)
-        if candidate.is_absolute():
-            try:
-                # 使用 strict=False 的 resolve 折叠 .. 和 .，不依赖存在性
-                return self.normalize_windows_path(candidate.resolve(strict=False))
-            except Exception:
-                return self.normalize_windows_path(candidate)
-        
+        # 绝对路径：直接按词法标准化（abspath = normpath，不访问文件系统）
+        # 注：沿用 Path.is_absolute 语义（Windows 下 "/foo" 无盘符，仍按当前文件所在盘解析）
+        if Path(href).is_absolute():
+            return Path(os.path.abspath(href))
+
         # 基础目录：使用当前文件的目录
-        base_dir = current_file.parent if current_file else Path.cwd()
-        
-        # 处理相对路径：确保正确解析 ./ 和 ../ 
-        # 关键修复：使用 resolve() 正确处理相对路径，避免目录累积
-        try:
-            # 先组合路径，然后标准化解析
-            combined = base_dir / href
-            # 使用 resolve(strict=False) 正确处理 ./ 和 ../ 语义
-            resolved = combined.resolve(strict=False)
-        except Exception:
-            # 降级处理
-            resolved = base_dir / href
-        
-        return self.normalize_windows_path(resolved)
+        base_dir = os.path.dirname(str(current_file)) if current_file else os.getcwd()
+
+        # 处理相对路径：组合后按词法折叠 ./ 和 ../，避免目录累积；
+        # 不使用 Path.resolve()，其会逐级 lstat 父目录以跟随符号链接，链接分类并不需要
+        return Path(os.path.abspath(os.path.join(base_dir, href)))
 
     def resolve_file_protocol(self, url: str) -> Path:
         """解析 file:// URL 为本地路径（Windows优先）。
         兼容形如 file:///C:/path/to/file.md 或 file:///d:/docs/a.md
         """
-        parsed = urlparse(url)
-        if parsed.scheme != "file":
-            raise ValueError("URL scheme is not file")
-        raw_path = unquote(parsed.path or "")
+        raw_path = unquote(_file_url_path(url))
         # Windows场景：/C:/path 形式，去掉起始斜杠
         if len(raw_path) >= 3 and raw_path[0] == "/" and raw_path[2] == ":":
             raw_path = raw_path.lstrip("/")
@@ -166,75 +343,189 @@ class PathResolver:
 
     def normalize_windows_path(self, path: Path) -> Path:
         # 使用os.path.normpath消除冗余段，尽量不访问文件系统
-        normed = os.path.normpath(str(path))
-        return Path(normed)
+        return _normalized_path(str(path))
+
+
+def _cached_stat(path_str: str, stat_cache: Optional[Dict[str, Any]] = None) -> Optional[os.stat_result]:
+    """stat 路径并可选地记入调用方提供的缓存；不存在或不可访问时返回 None。"""
+    if stat_cache is not None and path_str in stat_cache:
+        return stat_cache[path_str]
+    try:
+        st = os.stat(path_str)
+    except (OSError, ValueError):
+        st = None
+    if stat_cache is not None:
+        stat_cache[path_str] = st
+    return st
 
 
 class LinkValidator:
-    def validate(self, resolved: Any, policy: Dict[str, Any]) -> ValidationResult:
+    def __init__(self, policy: Optional[Dict[str, Any]] = None) -> None:
+        # 当前派生状态对应的策略快照：LinkPolicy 为对象本身，字典策略为其冻结副本
+        self._policy_key: Any = _UNSET
+        self._path_rule_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._path_rule_cache_max = 0
+        if policy is not None:
+            self.set_policy(policy)
+
+    def set_policy(self, policy: Any) -> None:
+        """预先计算策略派生值（白名单转为 frozenset），避免每次校验重复读取与线性查找。
+
+        policy 可为 LinkPolicy 或字典。
+        """
+        if isinstance(policy, LinkPolicy):
+            self._policy_key = policy
+        else:
+            self._policy_key = _freeze_policy_value(policy)
+            policy = LinkPolicy.from_dict(policy)
+        security = policy.security
+        windows_specific = policy.windows_specific
+        allowed_protocols = security.get("allowed_protocols")
+        self._allowed_protocols = frozenset(allowed_protocols) if allowed_protocols else None
+        # fail-closed：空列表或None → 空集合，拒绝所有外链
+        self._allowed_domains = frozenset(security.get("allowed_domains") or ())
+        self._forbidden_patterns = tuple(pat for pat in (security.get("forbidden_patterns") or []) if pat)
+        # 所有禁止模式合并为一个交替正则，单次扫描路径字符串
+        self._forbidden_re = (
+            re.compile("|".join(map(re.escape, self._forbidden_patterns))) if self._forbidden_patterns else None
+        )
+        max_depth = windows_specific.get("max_path_depth")
+        self._max_depth = int(max_depth) if max_depth else None
+        drive_letters = windows_specific.get("drive_letters")
+        self._drive_letters = frozenset(drive_letters) if drive_letters else None
+        self._check_exists = policy.check_exists
+        self._check_acl = policy.check_acl
+        # 词法规则结果依赖上面的派生规则：每次按内容重建策略都清空（容量沿用 cache_size，cache_enabled=False 时关闭）
+        self._path_rule_cache.clear()
+        self._path_rule_cache_max = max(0, int(policy.cache_size or 0)) if policy.cache_enabled else 0
+
+    def validate(self, resolved: Any, policy: Any,
+                 stat_cache: Optional[Dict[str, Any]] = None) -> ValidationResult:
         """最小可用校验：
         - URL: 协议/域名白名单（allowed_protocols/allowed_domains）
         - Path: 存在性、深度、禁止模式（forbidden_patterns）、可选ACL可读性
+
+        策略未变化时复用预计算结果；传入新的 LinkPolicy 或内容有变化的字典策略时重新计算。
+        stat_cache 由调用方在一次链接处理内共享，存在性检查与后续探测复用同一次 stat 结果。
         """
-        policy = policy or {}
-        security = (policy.get("security") or {})
-        windows_specific = (policy.get("windows_specific") or {})
+        self._sync_policy(policy)
 
         # URL校验
         if isinstance(resolved, str):
-            pr = urlparse(resolved)
+            pr = urlsplit(resolved)
             if pr.scheme:
-                allowed_protocols = security.get("allowed_protocols")
-                if allowed_protocols and pr.scheme not in allowed_protocols:
-                    return ValidationResult(ok=False, error_code=ErrorCode.SECURITY_BLOCKED, message="protocol not allowed", details={"scheme": pr.scheme})
-                if pr.scheme in ("http", "https"):
-                    allowed_domains = security.get("allowed_domains")
-                    # fail-closed：空列表或None → 拒绝外链
-                    if not allowed_domains or pr.netloc not in allowed_domains:
-                        return ValidationResult(ok=False, error_code=ErrorCode.SECURITY_BLOCKED, message="domain not allowed", details={"domain": pr.netloc})
-                return ValidationResult(ok=True)
+                return self.validate_url(pr.scheme, pr.netloc)
 
         # 路径校验
         if isinstance(resolved, Path):
-            # 先检查原始路径字符串中的禁止模式（在标准化之前）
+            # 词法规则（禁止模式/深度/盘符）只取决于路径字符串与策略，按策略缓存；存在性与ACL每次实时检查
             original_path_str = str(resolved)
-            forbidden_patterns = security.get("forbidden_patterns") or []
-            for pat in forbidden_patterns:
-                if pat and pat in original_path_str:
-                    return ValidationResult(ok=False, error_code=ErrorCode.SECURITY_BLOCKED, message="forbidden pattern", details={"pattern": pat})
-            
-            # 标准化
-            path_str = os.path.normpath(original_path_str)
-            p = Path(path_str)
-            
-            # 深度限制（在存在性检查之前，避免路径不存在时跳过深度检查）
-            max_depth = windows_specific.get("max_path_depth")
-            if max_depth:
-                # 以盘符/根为起点计算层级
-                parts = [part for part in p.parts if part not in (p.anchor, "")]
-                if len(parts) > int(max_depth):
-                    return ValidationResult(ok=False, error_code=ErrorCode.SECURITY_BLOCKED, message="max depth exceeded", details={"depth": len(parts), "max": max_depth})
-            
-            # 驱动器字母验证（Windows特定，在存在性检查之前）
-            drive_letters = windows_specific.get("drive_letters")
-            if drive_letters:
-                drive = p.drive
-                if drive and drive not in drive_letters:
-                    return ValidationResult(ok=False, error_code=ErrorCode.SECURITY_BLOCKED, message="drive not allowed", details={"drive": drive})
+            cached = self._path_rule_cache.get(original_path_str)
+            if cached is None:
+                cached = self._check_path_rules(original_path_str)
+                if self._path_rule_cache_max:
+                    self._path_rule_cache[original_path_str] = cached
+                    if len(self._path_rule_cache) > self._path_rule_cache_max:
+                        self._path_rule_cache.popitem(last=False)
+            else:
+                self._path_rule_cache.move_to_end(original_path_str)
+            blocked, path_str = cached
+            if blocked is not None:
+                return blocked
             
             # 存在性（默认检查）
-            if policy.get("check_exists", True):
-                if not p.exists():
+            if self._check_exists:
+                if _cached_stat(path_str, stat_cache) is None:
                     return ValidationResult(ok=False, error_code=ErrorCode.NOT_FOUND, message="path not found", details={"path": path_str})
             # 可选ACL（默认不检查，避免跨平台不稳定）
-            if policy.get("check_acl", False):
+            if self._check_acl:
                 if not os.access(path_str, os.R_OK):
                     return ValidationResult(ok=False, error_code=ErrorCode.PERMISSION_DENIED, message="no read permission", details={"path": path_str})
             
-            return ValidationResult(ok=True)
+            return _VALIDATION_OK
 
         # 其他类型默认通过
-        return ValidationResult(ok=True)
+        return _VALIDATION_OK
+
+    def _check_path_rules(self, original_path_str: str) -> tuple:
+        """执行路径的词法规则，返回 (拦截结果或None, 标准化后的路径字符串)。"""
+        # 先检查原始路径字符串中的禁止模式（在标准化之前）
+        if self._forbidden_re is not None and self._forbidden_re.search(original_path_str):
+            # 命中后按配置顺序报告首个匹配的模式，与逐个检查时的结果一致
+            pat = next(pat for pat in self._forbidden_patterns if pat in original_path_str)
+            return ValidationResult(ok=False, error_code=ErrorCode.SECURITY_BLOCKED, message="forbidden pattern", details={"pattern": pat}), None
+        
+        # 标准化
+        path_str = os.path.normpath(original_path_str)
+        
+        # 深度限制（在存在性检查之前，避免路径不存在时跳过深度检查）
+        max_depth = self._max_depth
+        if max_depth:
+            # 以盘符/根为起点计算层级（仅在配置了深度限制时才构造 Path）
+            p = Path(path_str)
+            parts = [part for part in p.parts if part not in (p.anchor, "")]
+            if len(parts) > max_depth:
+                return ValidationResult(ok=False, error_code=ErrorCode.SECURITY_BLOCKED, message="max depth exceeded", details={"depth": len(parts), "max": max_depth}), path_str
+        
+        # 驱动器字母验证（Windows特定，在存在性检查之前）；splitdrive 与 Path.drive 结果一致
+        if self._drive_letters is not None:
+            drive = os.path.splitdrive(path_str)[0]
+            if drive and drive not in self._drive_letters:
+                return ValidationResult(ok=False, error_code=ErrorCode.SECURITY_BLOCKED, message="drive not allowed", details={"drive": drive}), path_str
+        return None, path_str
+
+    def _sync_policy(self, policy: Any) -> None:
+        """派生状态与传入策略不一致时重建。
+
+        LinkPolicy 不可变，按对象身份判断；字典策略可能被调用方原地修改，按内容快照判断。
+        """
+        if isinstance(policy, LinkPolicy):
+            if policy is not self._policy_key:
+                self.set_policy(policy)
+        elif _freeze_policy_value(policy) != self._policy_key:
+            self.set_policy(policy)
+
+    def validate_url(self, scheme: str, netloc: str, policy: Any = _UNSET) -> ValidationResult:
+        """基于已拆分的 scheme/netloc 做协议与域名白名单校验（frozenset 查找），无需再次解析URL。"""
+        if policy is not _UNSET:
+            self._sync_policy(policy)
+        if not scheme:
+            return _VALIDATION_OK
+        if self._allowed_protocols is not None and scheme not in self._allowed_protocols:
+            return ValidationResult(ok=False, error_code=ErrorCode.SECURITY_BLOCKED, message="protocol not allowed", details={"scheme": scheme})
+        if scheme in ("http", "https"):
+            if netloc not in self._allowed_domains:
+                return ValidationResult(ok=False, error_code=ErrorCode.SECURITY_BLOCKED, message="domain not allowed", details={"domain": netloc})
+        return _VALIDATION_OK
+
+
+# 枚举成员名查表（Enum.name 为描述符属性，查表更快）
+_LINK_TYPE_NAMES: Dict[Any, str] = {lt: lt.name for lt in LinkType}
+_ERROR_CODE_NAMES: Dict[Any, str] = {ec: ec.name for ec in ErrorCode}
+
+# 预先创建的JSON编码器（等价于 json.dumps(..., ensure_ascii=False)），避免每条日志重复构造
+_JSON_LOG_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+# pyproject.toml 最小解析所用的预编译正则（按字节匹配）：段头 [xxx] / [[xxx]]，以及 version = ...
+_PYPROJECT_SECTION_RE = re.compile(rb"^\[+(.*?)\]+$")
+_PYPROJECT_VERSION_RE = re.compile(rb"""^version\s*=\s*(?:"([^"]*)|'([^']*)|(.*))""")
+
+# 关注的段名映射为唯一的标记对象，段名比较退化为身份比较；其余段统一为 None
+_PYPROJECT_SECTION_PROJECT = "project"
+_PYPROJECT_SECTION_POETRY = "tool.poetry"
+_PYPROJECT_SECTIONS: Dict[bytes, str] = {
+    b"project": _PYPROJECT_SECTION_PROJECT,
+    b"tool.poetry": _PYPROJECT_SECTION_POETRY,
+}
+
+
+def _read_small_file(path_str: str) -> bytes:
+    """一次性读取小文件（如 pyproject.toml）的全部字节：直接 os.open/os.read，绕过 pathlib 与文件对象包装。"""
+    fd = os.open(path_str, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        return os.read(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
 
 
 class LinkProcessor:
@@ -247,30 +538,48 @@ class LinkProcessor:
         # 统一适配为 LoggerAdapter，并固定额外字段
         self._cached_build_version: Optional[str] = None
         build_version = self._resolve_build_version(config_manager)
+        # 固定字段只构建一次，LoggerAdapter 与 JSON 日志共用
+        self._static_log_fields: Dict[str, Any] = {
+            "app": "local_markdown_viewer",
+            "module_name": "link_processor",
+            "build_version": build_version,
+        }
         if logger is not None and not isinstance(logger, logging.LoggerAdapter):
-            self.logger = logging.LoggerAdapter(
-                logger,
-                {"app": "local_markdown_viewer", "module_name": "link_processor", "build_version": build_version},
-            )
+            self.logger = logging.LoggerAdapter(logger, self._static_log_fields)
         else:
             self.logger = logger
-        self.recognizer = LinkTypeRecognizer()
         self.path_resolver = PathResolver()
         self.validator = LinkValidator()
         self._handlers: Dict[LinkType, ILinkHandler] = {}
+        # 待批量提交的链接快照（snapshot_batch_size > 1 时启用）
+        self._snapshot_buf: List[Dict[str, Any]] = []
         # 从配置加载策略
-        self.policy = self._load_policy_from_config()
+        self.set_policy(self._load_policy_from_config())
+        # 识别缓存容量沿用配置中的 cache_size；cache_enabled=False 时关闭缓存
+        cache_size = self.policy.cache_size if self.policy.cache_enabled else 0
+        self.recognizer = LinkTypeRecognizer(cache_size=cache_size)
 
     def set_handlers(self, handlers: Dict[LinkType, ILinkHandler]) -> None:
         self._handlers.update(handlers)
 
-    def set_policy(self, policy: Dict[str, Any]) -> None:
-        self.policy = policy or {}
+    def set_policy(self, policy: Any) -> None:
+        """设置策略：接受 LinkPolicy 或字典（字典按 LinkPolicy.from_dict 规范化）。"""
+        self.policy = policy if isinstance(policy, LinkPolicy) else LinkPolicy.from_dict(policy)
+        # 每条链接都会读取的日志开关，在设置策略时算好
+        self._json_logging = bool(self.policy.logging.get("json", False))
+        self._logging_enabled = bool(self.logger) and bool(self.policy.logging.get("enabled", True))
+        try:
+            self._snapshot_batch_size = max(1, int(self.policy.snapshot_batch_size or 1))
+        except (TypeError, ValueError):
+            self._snapshot_batch_size = 1
+        # 切换策略前先提交已缓冲的快照
+        if self._snapshot_buf:
+            self.flush_snapshots()
         
-    def _load_policy_from_config(self) -> Dict[str, Any]:
+    def _load_policy_from_config(self) -> LinkPolicy:
         """从配置管理器加载链接处理策略"""
         if not self.config_manager:
-            return {"check_exists": True, "security": {}}
+            return LinkPolicy()
         try:
             cm = self.config_manager or get_config_manager()
             get_uc = getattr(cm, "get_unified_config", None)
@@ -298,245 +607,48 @@ class LinkProcessor:
                 except Exception:
                     sec_cfg = {}
 
-            # 默认策略（fail-closed：存在性检查为True）
-            policy: Dict[str, Any] = {
-                "enabled": (link_cfg.get("enabled", True) if isinstance(link_cfg, dict) else True),
+            # 非字典配置按空配置处理，其余键缺省值见 LinkPolicy（fail-closed：存在性检查为True）
+            if not isinstance(link_cfg, dict):
+                link_cfg = {}
+            return LinkPolicy.from_dict({
+                **link_cfg,
                 # 兼容旧键：relative_paths → check_exists（仅当未显式提供check_exists时）
-                "check_exists": bool(
-                    link_cfg.get("check_exists", link_cfg.get("relative_paths", True))
-                ) if isinstance(link_cfg, dict) else True,
-                "external_links": (link_cfg.get("external_links", True) if isinstance(link_cfg, dict) else True),
-                "image_links": (link_cfg.get("image_links", True) if isinstance(link_cfg, dict) else True),
-                "mermaid_links": (link_cfg.get("mermaid_links", True) if isinstance(link_cfg, dict) else True),
-                "file_protocol": (link_cfg.get("file_protocol", True) if isinstance(link_cfg, dict) else True),
-                "cache_enabled": (link_cfg.get("cache_enabled", True) if isinstance(link_cfg, dict) else True),
-                "cache_size": (link_cfg.get("cache_size", 1000) if isinstance(link_cfg, dict) else 1000),
-                "error_handling": (link_cfg.get("error_handling", "strict") if isinstance(link_cfg, dict) else "strict"),
-                "windows_specific": (link_cfg.get("windows_specific", {}) if isinstance(link_cfg, dict) else {}),
+                "check_exists": link_cfg.get("check_exists", link_cfg.get("relative_paths", True)),
+                # 加载配置时不启用ACL检查（仅可通过 set_policy 显式开启）
+                "check_acl": False,
                 # security 合并：link_cfg.security 优先，否则采用独立的 sec_cfg
-                "security": (link_cfg.get("security") if isinstance(link_cfg, dict) else None) or sec_cfg or {},
-                "logging": (link_cfg.get("logging", {}) if isinstance(link_cfg, dict) else {}),
-            }
-
-            return policy
+                "security": link_cfg.get("security") or sec_cfg or {},
+            })
         except Exception as ex:
             if self.logger:
                 self.logger.warning(f"Failed to load link processing config: {ex}")
             # 默认保持保守策略
-            return {"check_exists": True, "security": {}}
+            return LinkPolicy()
 
     def process_link(self, ctx: LinkContext) -> LinkResult:  # pragma: no cover - 简化骨架
+        # 单次链接处理内共享的 stat 结果，避免校验、.md.md 回退与 UNKNOWN 探测重复 stat
+        return self._process_one(ctx, {})
+
+    def process_links(self, ctxs: Iterable[LinkContext]) -> List[LinkResult]:
+        """批量处理链接（如整篇文档的 TOC/链接预检）：
+        - 逐条结果与 process_link 一致
+        - 整批共享同一份 stat 缓存，同目录下的链接不再重复 stat
+        """
+        process_one = self._process_one
+        stat_cache: Dict[str, Any] = {}
+        return [process_one(ctx, stat_cache) for ctx in ctxs]
+
+    def _process_one(self, ctx: LinkContext, stat_cache: Dict[str, Any]) -> LinkResult:
         try:
-            # 保护extra
+            # 保护extra（默认已为空字典，仍兼容显式传入 None）
             if ctx.extra is None:
                 ctx.extra = {}
             session_id = ctx.extra.get("session_id")
 
             link_type = self.recognizer.recognize(ctx.href, ctx)
-            result: LinkResult
-
-            # 预处理：解析与验证
-            if link_type in (LinkType.RELATIVE_MD, LinkType.DIRECTORY):
-                base_file = ctx.current_file or (ctx.current_dir / "_base_.md" if ctx.current_dir else None)
-                resolved_path = self.path_resolver.resolve_relative(base_file, ctx.href)
-                vres = self.validator.validate(resolved_path, self.policy)
-
-                # 处理 '.md.md' 路径
-                if (not vres.ok) and vres.error_code == ErrorCode.NOT_FOUND:
-                    try:
-                        name = resolved_path.name if isinstance(resolved_path, Path) else ""
-                    except Exception:
-                        name = ""
-                    if name and name.lower().endswith(".md.md"):
-                        try:
-                            fixed_name = name[:-3]  # '.md'
-                            candidate = resolved_path.with_name(fixed_name)
-                        except Exception:
-                            candidate = None
-                        if candidate is not None and candidate.exists():
-                            vres2 = self.validator.validate(candidate, self.policy)
-                            if vres2.ok:
-                                resolved_path = candidate
-                                vres = vres2
-
-                if not vres.ok:
-                    result = LinkResult(success=False, action="show_error", payload={"path": str(resolved_path)}, message=vres.message, error_code=vres.error_code)
-                else:
-                    handler = self._handlers.get(link_type)
-                    if handler is None:
-                        result = LinkResult(success=False, action="", payload={}, message="Handler not implemented", error_code=ErrorCode.UNSUPPORTED)
-                    else:
-                        result = handler.handle(ctx, resolved_path)
-
-            elif link_type == LinkType.FILE_PROTOCOL:
-                try:
-                    resolved_path = self.path_resolver.resolve_file_protocol(ctx.href)
-                except Exception as ex:
-                    result = LinkResult(success=False, action="show_error", payload={}, message=str(ex), error_code=ErrorCode.RESOLVE_ERROR)
-                else:
-                    vres = self.validator.validate(resolved_path, self.policy)
-                    if not vres.ok:
-                        result = LinkResult(success=False, action="show_error", payload={"path": str(resolved_path)}, message=vres.message, error_code=vres.error_code)
-                    else:
-                        handler = self._handlers.get(LinkType.FILE_PROTOCOL)
-                        if handler is None:
-                            result = LinkResult(success=False, action="", payload={}, message="Handler not implemented", error_code=ErrorCode.UNSUPPORTED)
-                        else:
-                            result = handler.handle(ctx, resolved_path)
-
-            elif link_type == LinkType.EXTERNAL_HTTP:
-                # 始终执行URL校验（fail-closed 策略）
-                vres = self.validator.validate(ctx.href, self.policy)
-                if not vres.ok:
-                    result = LinkResult(success=False, action="show_error", payload={"url": ctx.href}, message=vres.message, error_code=vres.error_code)
-                else:
-                    handler = self._handlers.get(link_type)
-                    if handler is None:
-                        result = LinkResult(success=False, action="", payload={}, message="Handler not implemented", error_code=ErrorCode.UNSUPPORTED)
-                    else:
-                        result = handler.handle(ctx, ctx.href)
-
-            elif link_type == LinkType.IMAGE:
-                # 图片链接处理
-                handler = self._handlers.get(link_type)
-                if handler is None:
-                    result = LinkResult(success=False, action="", payload={}, message="Handler not implemented", error_code=ErrorCode.UNSUPPORTED)
-                else:
-                    result = handler.handle(ctx, ctx.href)
-                    
-            elif link_type == LinkType.MERMAID:
-                # Mermaid图表链接处理
-                handler = self._handlers.get(link_type)
-                if handler is None:
-                    result = LinkResult(success=False, action="", payload={}, message="Handler not implemented", error_code=ErrorCode.UNSUPPORTED)
-                else:
-                    result = handler.handle(ctx, ctx.href)
-                    
-            elif link_type == LinkType.TOC:
-                # TOC目录项处理：
-                # - 形如 "other.md#anchor" 的跨文档锚点：解析出目标 markdown 文件路径和片段
-                # - 其他无法安全识别为跨文档的场景：保持向后兼容，仅将原始 href 交给处理器
-                handler = self._handlers.get(link_type)
-                if handler is None:
-                    result = LinkResult(success=False, action="", payload={}, message="Handler not implemented", error_code=ErrorCode.UNSUPPORTED)
-                else:
-                    raw = ctx.href or ""
-                    # 不含 #：退化为旧行为
-                    if "#" not in raw:
-                        result = handler.handle(ctx, raw)
-                    else:
-                        path_part, fragment = raw.split("#", 1)
-                        # 仅在当前有明确的当前文件、且 path_part 看起来是 markdown 文件时，才按“跨文档”处理
-                        if not (ctx.current_file and path_part.strip().lower().endswith(".md")):
-                            # 向后兼容：仍交由处理器按原始 href 解释
-                            result = handler.handle(ctx, raw)
-                        else:
-                            base_file = ctx.current_file or (ctx.current_dir / "_base_.md" if ctx.current_dir else None)
-                            resolved_path = self.path_resolver.resolve_relative(base_file, path_part)
-                            vres = self.validator.validate(resolved_path, self.policy)
-
-                            # 处理 '.md.md' 路径
-                            if (not vres.ok) and vres.error_code == ErrorCode.NOT_FOUND:
-                                try:
-                                    name = resolved_path.name if isinstance(resolved_path, Path) else ""
-                                except Exception:
-                                    name = ""
-                                if name and name.lower().endswith(".md.md"):
-                                    try:
-                                        fixed_name = name[:-3]
-                                        candidate = resolved_path.with_name(fixed_name)
-                                    except Exception:
-                                        candidate = None
-                                    if candidate is not None and candidate.exists():
-                                        vres2 = self.validator.validate(candidate, self.policy)
-                                        if vres2.ok:
-                                            resolved_path = candidate
-                                            vres = vres2
-
-                            if not vres.ok:
-                                result = LinkResult(
-                                    success=False,
-                                    action="show_error",
-                                    payload={"path": str(resolved_path)},
-                                    message=vres.message,
-                                    error_code=vres.error_code,
-                                )
-                            else:
-                                # 将解析后的目标文件路径与片段一起交给处理器，由其决定具体动作
-                                resolved_info = {"path": resolved_path, "fragment": fragment}
-                                result = handler.handle(ctx, resolved_info)
-
-            elif link_type == LinkType.UNKNOWN and ctx.href and (ctx.current_file or ctx.current_dir):
-                # 兜底：优先尝试将 UNKNOWN 识别为本地目录或文件，例如 "./10_AI_tools"、"universal-session-timestamp.js" 等
-                try:
-                    base_file = ctx.current_file or (ctx.current_dir / "_base_.md" if ctx.current_dir else None)
-                    resolved_path = self.path_resolver.resolve_relative(base_file, ctx.href)
-                except Exception as ex:
-                    result = LinkResult(success=False, action="", payload={}, message=str(ex), error_code=ErrorCode.INTERNAL_ERROR)
-                else:
-                    is_dir = False
-                    is_file = False
-                    try:
-                        if resolved_path.exists():
-                            is_dir = resolved_path.is_dir()
-                            is_file = resolved_path.is_file()
-                    except Exception:
-                        is_dir = False
-                        is_file = False
-
-                    if is_dir:
-                        # 作为目录处理（用于 ./10_AI_tools 这类链接）
-                        vres = self.validator.validate(resolved_path, self.policy)
-                        if not vres.ok:
-                            result = LinkResult(
-                                success=False,
-                                action="show_error",
-                                payload={"path": str(resolved_path)},
-                                message=vres.message,
-                                error_code=vres.error_code,
-                            )
-                        else:
-                            handler = self._handlers.get(LinkType.DIRECTORY)
-                            if handler is None:
-                                result = LinkResult(success=False, action="", payload={}, message="Handler not implemented", error_code=ErrorCode.UNSUPPORTED)
-                            else:
-                                # 记录为 DIRECTORY 类型，便于日志与后续分析
-                                link_type = LinkType.DIRECTORY
-                                result = handler.handle(ctx, resolved_path)
-                    elif is_file:
-                        # 作为普通文件处理：交由上层根据扩展名决定如何展示（例如 .js/.txt）
-                        vres = self.validator.validate(resolved_path, self.policy)
-                        if not vres.ok:
-                            result = LinkResult(
-                                success=False,
-                                action="show_error",
-                                payload={"path": str(resolved_path)},
-                                message=vres.message,
-                                error_code=vres.error_code,
-                            )
-                        else:
-                            result = LinkResult(
-                                success=True,
-                                action="open_file",
-                                payload={"path": str(resolved_path)},
-                                message="",
-                                error_code=None,
-                            )
-                    else:
-                        # 仍视为 UNKNOWN，回退到默认处理逻辑
-                        handler = self._handlers.get(link_type)
-                        if handler is None:
-                            result = LinkResult(success=False, action="", payload={}, message="Handler not implemented", error_code=ErrorCode.UNSUPPORTED)
-                        else:
-                            result = handler.handle(ctx, ctx.href)
-
-            else:
-                # 其他类型维持原有简单路由（例如 ANCHOR）
-                handler = self._handlers.get(link_type)
-                if handler is None:
-                    result = LinkResult(success=False, action="", payload={}, message="Handler not implemented", error_code=ErrorCode.UNSUPPORTED)
-                else:
-                    result = handler.handle(ctx, ctx.href)
+            # 按链接类型查表分派（解析 + 校验 + 处理器），未登记的类型直接交给处理器
+            route = self._ROUTES.get(link_type, LinkProcessor._route_direct)
+            result, link_type = route(self, ctx, link_type, stat_cache)
 
             # 日志
             self._log_event(session_id, ctx, link_type, result)
@@ -549,32 +661,168 @@ class LinkProcessor:
             self._record_link_snapshot(ctx, result)
             return result
 
+    # --- 分派辅助 ---
+
+    def _dispatch(self, link_type: LinkType, ctx: LinkContext, resolved: Any) -> LinkResult:
+        """查找处理器并调用；未注册时返回 UNSUPPORTED。"""
+        handler = self._handlers.get(link_type)
+        if handler is None:
+            return _UNSUPPORTED_RESULT
+        return handler.handle(ctx, resolved)
+
+    @staticmethod
+    def _validation_error(vres: ValidationResult, payload: Dict[str, Any]) -> LinkResult:
+        return LinkResult(False, "show_error", payload, vres.message, vres.error_code)
+
+    @staticmethod
+    def _base_file(ctx: LinkContext) -> Optional[Path]:
+        return ctx.current_file or (ctx.current_dir / "_base_.md" if ctx.current_dir else None)
+
+    def _validate_local(self, resolved_path: Path, stat_cache: Dict[str, Any]) -> tuple:
+        """校验本地路径；不存在且文件名为 '.md.md' 时尝试去掉多余的 '.md' 后重新校验。
+
+        返回 (最终路径, 校验结果)。
+        """
+        vres = self.validator.validate(resolved_path, self.policy, stat_cache)
+        if vres.error_code is ErrorCode.NOT_FOUND:
+            fixed = self._maybe_fix_md_md(resolved_path, stat_cache)
+            if fixed is not None:
+                return fixed
+        return resolved_path, vres
+
+    def _maybe_fix_md_md(self, resolved_path: Path, stat_cache: Dict[str, Any]) -> Optional[tuple]:
+        """'.md.md' 回退：先用字符串后缀预筛，命中且修正后的文件存在并通过校验时返回 (路径, 校验结果)。"""
+        name = resolved_path.name
+        if name[-6:].lower() != ".md.md":
+            return None
+        candidate = resolved_path.with_name(name[:-3])  # 去掉一个 '.md'
+        if _cached_stat(str(candidate), stat_cache) is None:
+            return None
+        vres = self.validator.validate(candidate, self.policy, stat_cache)
+        return (candidate, vres) if vres.ok else None
+
+    # --- 各链接类型的处理路线：返回 (结果, 用于日志的链接类型) ---
+
+    def _route_direct(self, ctx: LinkContext, link_type: LinkType, stat_cache: Dict[str, Any]) -> tuple:
+        # 其他类型维持原有简单路由（例如 ANCHOR、IMAGE、MERMAID）
+        return self._dispatch(link_type, ctx, ctx.href), link_type
+
+    def _route_local(self, ctx: LinkContext, link_type: LinkType, stat_cache: Dict[str, Any]) -> tuple:
+        # RELATIVE_MD / DIRECTORY：解析与验证
+        resolved_path = self.path_resolver.resolve_relative(self._base_file(ctx), ctx.href)
+        resolved_path, vres = self._validate_local(resolved_path, stat_cache)
+        if not vres.ok:
+            return self._validation_error(vres, {"path": str(resolved_path)}), link_type
+        return self._dispatch(link_type, ctx, resolved_path), link_type
+
+    def _route_file_protocol(self, ctx: LinkContext, link_type: LinkType, stat_cache: Dict[str, Any]) -> tuple:
+        try:
+            resolved_path = self.path_resolver.resolve_file_protocol(ctx.href)
+        except Exception as ex:
+            return LinkResult(success=False, action="show_error", payload={}, message=str(ex), error_code=ErrorCode.RESOLVE_ERROR), link_type
+        vres = self.validator.validate(resolved_path, self.policy, stat_cache)
+        if not vres.ok:
+            return self._validation_error(vres, {"path": str(resolved_path)}), link_type
+        return self._dispatch(link_type, ctx, resolved_path), link_type
+
+    def _route_external(self, ctx: LinkContext, link_type: LinkType, stat_cache: Dict[str, Any]) -> tuple:
+        # 始终执行URL校验（fail-closed 策略）；urlsplit 自带解析缓存，重复外链无需重新解析
+        pr = urlsplit(ctx.href)
+        vres = self.validator.validate_url(pr.scheme, pr.netloc, self.policy)
+        if not vres.ok:
+            return self._validation_error(vres, {"url": ctx.href}), link_type
+        return self._dispatch(link_type, ctx, ctx.href), link_type
+
+    def _route_toc(self, ctx: LinkContext, link_type: LinkType, stat_cache: Dict[str, Any]) -> tuple:
+        # TOC目录项处理：
+        # - 形如 "other.md#anchor" 的跨文档锚点：解析出目标 markdown 文件路径和片段
+        # - 其他无法安全识别为跨文档的场景：保持向后兼容，仅将原始 href 交给处理器
+        if self._handlers.get(link_type) is None:
+            return self._dispatch(link_type, ctx, ctx.href), link_type
+        raw = ctx.href or ""
+        # 不含 #：退化为旧行为
+        if "#" not in raw:
+            return self._dispatch(link_type, ctx, raw), link_type
+        path_part, fragment = raw.split("#", 1)
+        # 仅在当前有明确的当前文件、且 path_part 看起来是 markdown 文件时，才按“跨文档”处理
+        if not (ctx.current_file and path_part.strip().lower().endswith(".md")):
+            # 向后兼容：仍交由处理器按原始 href 解释
+            return self._dispatch(link_type, ctx, raw), link_type
+        resolved_path = self.path_resolver.resolve_relative(self._base_file(ctx), path_part)
+        resolved_path, vres = self._validate_local(resolved_path, stat_cache)
+        if not vres.ok:
+            return self._validation_error(vres, {"path": str(resolved_path)}), link_type
+        # 将解析后的目标文件路径与片段一起交给处理器，由其决定具体动作
+        return self._dispatch(link_type, ctx, {"path": resolved_path, "fragment": fragment}), link_type
+
+    def _route_unknown(self, ctx: LinkContext, link_type: LinkType, stat_cache: Dict[str, Any]) -> tuple:
+        if not (ctx.href and (ctx.current_file or ctx.current_dir)):
+            return self._route_direct(ctx, link_type, stat_cache)
+        # 兜底：优先尝试将 UNKNOWN 识别为本地目录或文件，例如 "./10_AI_tools"、"universal-session-timestamp.js" 等
+        try:
+            resolved_path = self.path_resolver.resolve_relative(self._base_file(ctx), ctx.href)
+        except Exception as ex:
+            return LinkResult(success=False, action="", payload={}, message=str(ex), error_code=ErrorCode.INTERNAL_ERROR), link_type
+
+        # 一次 stat（跟随符号链接，与 Path.exists/is_dir/is_file 语义一致）同时得到存在性与类型；
+        # 结果记入 stat_cache，后续 validate 的存在性检查直接复用
+        st = _cached_stat(str(resolved_path), stat_cache)
+        mode = st.st_mode if st is not None else 0
+        is_dir = stat.S_ISDIR(mode)
+        is_file = stat.S_ISREG(mode)
+
+        if not (is_dir or is_file):
+            # 仍视为 UNKNOWN，回退到默认处理逻辑
+            return self._dispatch(link_type, ctx, ctx.href), link_type
+
+        vres = self.validator.validate(resolved_path, self.policy, stat_cache)
+        if not vres.ok:
+            return self._validation_error(vres, {"path": str(resolved_path)}), link_type
+        if is_file:
+            # 作为普通文件处理：交由上层根据扩展名决定如何展示（例如 .js/.txt）
+            return _ok_result("open_file", {"path": str(resolved_path)}), link_type
+        # 作为目录处理（用于 ./10_AI_tools 这类链接）
+        if self._handlers.get(LinkType.DIRECTORY) is None:
+            return self._dispatch(LinkType.DIRECTORY, ctx, resolved_path), link_type
+        # 记录为 DIRECTORY 类型，便于日志与后续分析
+        return self._dispatch(LinkType.DIRECTORY, ctx, resolved_path), LinkType.DIRECTORY
+
+    # 链接类型 → 处理路线
+    _ROUTES: Dict[LinkType, Any] = {
+        LinkType.RELATIVE_MD: _route_local,
+        LinkType.DIRECTORY: _route_local,
+        LinkType.FILE_PROTOCOL: _route_file_protocol,
+        LinkType.EXTERNAL_HTTP: _route_external,
+        LinkType.TOC: _route_toc,
+        LinkType.UNKNOWN: _route_unknown,
+    }
+
     def _log_event(self, session_id: Optional[str], ctx: LinkContext, link_type: LinkType, result: LinkResult) -> None:
-        if not self.logger:
+        # 无日志器、策略关闭日志或INFO级别未开启时，不构建事件字典
+        if not self._logging_enabled:
             return
+        logger = self.logger
         try:
+            if not logger.isEnabledFor(logging.INFO):
+                return
+            error_code = result.error_code
             event = {
                 "session_id": session_id,
                 "href": ctx.href,
-                "type": link_type.name if isinstance(link_type, LinkType) else str(link_type),
+                "type": _LINK_TYPE_NAMES.get(link_type) or str(link_type),
                 "action": result.action,
                 "success": result.success,
-                "error_code": result.error_code.name if result.error_code else None,
+                "error_code": _ERROR_CODE_NAMES.get(error_code) if error_code else None,
             }
-            logging_cfg = (self.policy.get("logging") or {})
-            if logging_cfg.get("json", False):
+            if self._json_logging:
                 # 结构化JSON日志
                 # 附带固定字段
-                event.update({
-                    "app": "local_markdown_viewer",
-                    "module_name": "link_processor",
-                    "build_version": self._resolve_build_version(self.config_manager),
-                })
-                self.logger.info(json.dumps(event, ensure_ascii=False))
+                event.update(self._static_log_fields)
+                logger.info(_JSON_LOG_ENCODER.encode(event))
             else:
                 # 标准extra字段（推荐）
                 # 确保extra字段正确传递到LogRecord
-                self.logger.info("link_processed", extra=event)
+                logger.info("link_processed", extra=event)
         except Exception:
             # 不影响主流程
             pass
@@ -584,7 +832,7 @@ class LinkProcessor:
         if snapshot_manager:
             try:
                 extra = ctx.extra or {}
-                snapshot_manager.save_link_snapshot({
+                data = {
                     "link_processor_loaded": True,
                     "policy_profile": extra.get("policy", "default"),
                     "last_action": result.action or "none",
@@ -599,7 +847,15 @@ class LinkProcessor:
                     },
                     "error_code": (result.error_code.name if result.error_code else ""),
                     "message": result.message,
-                })
+                }
+                if self._snapshot_batch_size > 1:
+                    # 批量模式：记录发生时间，攒够一批再一次性提交
+                    data["timestamp"] = datetime.now(timezone.utc).isoformat()
+                    self._snapshot_buf.append(data)
+                    if len(self._snapshot_buf) >= self._snapshot_batch_size:
+                        self.flush_snapshots()
+                else:
+                    snapshot_manager.save_link_snapshot(data)
             except Exception:
                 pass
         metrics = getattr(self, "performance_metrics", None)
@@ -611,6 +867,29 @@ class LinkProcessor:
             except Exception:
                 pass
 
+    def flush_snapshots(self) -> None:
+        """提交缓冲中的链接快照；快照管理器不支持批量接口时逐条保存。"""
+        if not self._snapshot_buf:
+            return
+        batch = self._snapshot_buf
+        self._snapshot_buf = []
+        snapshot_manager = getattr(self, "snapshot_manager", None)
+        if not snapshot_manager:
+            return
+        try:
+            save_batch = getattr(snapshot_manager, "save_link_snapshots", None)
+            if callable(save_batch):
+                save_batch(batch)
+            else:
+                for data in batch:
+                    snapshot_manager.save_link_snapshot(data)
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        """释放前提交剩余的链接快照。"""
+        self.flush_snapshots()
+
     def _resolve_build_version(self, config_manager: Any) -> str:
         # 缓存命中
         if self._cached_build_version:
@@ -629,94 +908,164 @@ class LinkProcessor:
         if env_v:
             self._cached_build_version = env_v
             return self._cached_build_version
-        # 3) pyproject.toml（PEP 621 或 poetry）
-        try:
-            from pathlib import Path as _Path
-            here = _Path(__file__).resolve()
-            for parent in list(here.parents)[:6]:
-                cand = parent / "pyproject.toml"
-                if cand.exists():
-                    ver = self._read_pyproject_version(cand)
-                    if ver:
-                        self._cached_build_version = ver
-                        return ver
-        except Exception:
-            pass
+        # 3) pyproject.toml（PEP 621 或 poetry），进程内只查找一次
+        ver = self._detect_pyproject_version()
+        if ver:
+            self._cached_build_version = ver
+            return ver
         # 4) 默认
         self._cached_build_version = "dev"
         return self._cached_build_version
 
-    def _read_pyproject_version(self, toml_path: Path) -> Optional[str]:
-        """最小无依赖解析：
+    # 类级缓存：pyproject.toml 版本号在进程内不变，避免每个实例重复遍历父目录与解析
+    _pyproject_version: Any = _UNSET
+
+    @classmethod
+    def _detect_pyproject_version(cls) -> Optional[str]:
+        if cls._pyproject_version is not _UNSET:
+            return cls._pyproject_version
+        ver = None
+        try:
+            # 以字符串路径向上查找（最多 6 层），os.path.exists 比 Path.exists 开销更小
+            parent = os.path.dirname(os.path.realpath(__file__))
+            for _ in range(6):
+                cand = os.path.join(parent, "pyproject.toml")
+                if os.path.exists(cand):
+                    ver = cls._read_pyproject_version(Path(cand))
+                    if ver:
+                        break
+                up = os.path.dirname(parent)
+                if up == parent:
+                    break
+                parent = up
+        except Exception:
+            ver = None
+        cls._pyproject_version = ver
+        return ver
+
+    @staticmethod
+    def _read_pyproject_version(toml_path: Path) -> Optional[str]:
+        """读取 pyproject.toml 中的版本号，按 (路径, mtime_ns, size) 缓存解析结果，文件变化后自动重新解析。"""
+        try:
+            st = os.stat(toml_path)
+        except OSError:
+            return LinkProcessor._parse_pyproject_version(toml_path)
+        return LinkProcessor._parse_pyproject_version_cached((str(toml_path), st.st_mtime_ns, st.st_size))
+
+    @staticmethod
+    @lru_cache(maxsize=16)
+    def _parse_pyproject_version_cached(key: tuple) -> Optional[str]:
+        return LinkProcessor._parse_pyproject_version(Path(key[0]))
+
+    @staticmethod
+    def _parse_pyproject_version(toml_path: Path) -> Optional[str]:
+        """解析 pyproject.toml 中的版本号：
+        - 优先 [project] 表中的 version
+        - 其次 [tool.poetry] 中的 version
+        使用 tomllib（3.11+）或 tomli 解析；两者均不可用时退回最小无依赖解析。
+        """
+        if tomllib is None:
+            return LinkProcessor._read_pyproject_version_fallback(toml_path)
+        try:
+            data = tomllib.loads(_read_small_file(str(toml_path)).decode("utf-8"))
+            project = data.get("project")
+            version = project.get("version") if isinstance(project, dict) else None
+            if not (isinstance(version, str) and version):
+                poetry = (data.get("tool") or {}).get("poetry")
+                version = poetry.get("version") if isinstance(poetry, dict) else None
+            return version if isinstance(version, str) and version else None
+        except Exception:
+            return None
+
+    @staticmethod
+    def _read_pyproject_version_fallback(toml_path: Path) -> Optional[str]:
+        """最小无依赖解析（无 tomllib/tomli 时使用）：
         - 优先 [project] 表中的 version = "x.y.z"
         - 其次 [tool.poetry] 中的 version = "x.y.z"
         """
         try:
-            text = toml_path.read_text(encoding="utf-8", errors="ignore")
+            # 按字节逐行扫描，仅在提取到版本值时解码，避免整文件 UTF-8 解码
+            data = _read_small_file(str(toml_path))
             # 简单状态机识别当前段
             current = None
             version_in_project = None
             version_in_poetry = None
-            for raw in text.splitlines():
+            for raw in data.splitlines():
                 line = raw.strip()
-                if not line or line.startswith("#"):
+                if not line or line[:1] == b"#":
                     continue
-                if line.startswith("[") and line.endswith("]"):
-                    current = line.strip("[]").strip()
+                m = _PYPROJECT_SECTION_RE.match(line)
+                if m:
+                    current = _PYPROJECT_SECTIONS.get(m.group(1).strip())
                     continue
-                if line.startswith("version") and "=" in line:
-                    # 提取右侧字符串
-                    try:
-                        right = line.split("=", 1)[1].strip()
-                        if right.startswith("\""):
-                            val = right.split("\"", 2)[1]
-                        elif right.startswith("'"):
-                            val = right.split("'", 2)[1]
-                        else:
-                            val = right
-                    except Exception:
-                        continue
-                    if current == "project" and not version_in_project:
-                        version_in_project = val
-                    elif current == "tool.poetry" and not version_in_poetry:
-                        version_in_poetry = val
+                m = _PYPROJECT_VERSION_RE.match(line)
+                if not m:
+                    continue
+                val = m.group(m.lastindex)
+                if current is _PYPROJECT_SECTION_PROJECT and val:
+                    # [project] 优先级最高：找到即返回，无需继续扫描
+                    version_in_project = val.decode("utf-8", "ignore")
+                    if version_in_project:
+                        return version_in_project
+                elif current is _PYPROJECT_SECTION_POETRY and not version_in_poetry:
+                    version_in_poetry = val.decode("utf-8", "ignore")
             return version_in_project or version_in_poetry
         except Exception:
             return None
 
 
+@lru_cache(maxsize=256)
+def _decode_anchor(fragment: str) -> str:
+    """URL 解码锚点片段；不含 % 时原样返回。同一文档内锚点反复出现（TOC 点击、重渲染），按片段缓存。"""
+    return unquote(fragment) if "%" in fragment else fragment
+
+
+def _ok_result(action: str, payload: Dict[str, Any]) -> LinkResult:
+    """构造成功结果：位置参数传入，message/error_code 取字段默认值（比逐个关键字传参更快）。"""
+    return LinkResult(True, action, payload)
+
+
+def _as_str(x: Any) -> str:
+    """路径转字符串：已是 str 时直接返回（精确类型判断，避免多余的 str() 调用）。"""
+    return x if type(x) is str else str(x)
+
+
 # 简单的占位处理器，便于路由测试
 class ExternalHandler:
     def handle(self, ctx: LinkContext, resolved: Any) -> LinkResult:
-        return LinkResult(success=True, action="open_browser", payload={"url": ctx.href}, message="", error_code=None)
+        return _ok_result("open_browser", {"url": ctx.href})
 
 
 class RelativeMarkdownHandler:
     def handle(self, ctx: LinkContext, resolved: Any) -> LinkResult:
-        return LinkResult(success=True, action="open_markdown_in_tree", payload={"path": str(resolved)}, message="", error_code=None)
+        return _ok_result("open_markdown_in_tree", {"path": _as_str(resolved)})
 
 
 class DirectoryHandler:
     def handle(self, ctx: LinkContext, resolved: Any) -> LinkResult:
-        return LinkResult(success=True, action="open_directory", payload={"path": str(resolved)}, message="", error_code=None)
+        return _ok_result("open_directory", {"path": _as_str(resolved)})
 
 
 class AnchorHandler:
     def handle(self, ctx: LinkContext, resolved: Any) -> LinkResult:
         # 提取锚点ID（去掉#号），并对 href 中可能存在的URL编码进行解码，
         # 以匹配 markdown_utils.slugify 生成的实际 DOM id（中文等保持原文）。
-        anchor_id = unquote(ctx.href.lstrip('#'))
-        return LinkResult(success=True, action="scroll_to_anchor", payload={"id": anchor_id}, message="", error_code=None)
+        href = ctx.href
+        if href[:1] == "#":
+            # 常见的单个 # 前缀直接切片；仅多个 # 时才走 lstrip
+            href = href[1:] if href[1:2] != "#" else href.lstrip("#")
+        anchor_id = _decode_anchor(href)
+        return _ok_result("scroll_to_anchor", {"id": anchor_id})
 
 
 class ImageHandler:
     def handle(self, ctx: LinkContext, resolved: Any) -> LinkResult:
-        return LinkResult(success=True, action="open_image_viewer", payload={"path": str(resolved)}, message="", error_code=None)
+        return _ok_result("open_image_viewer", {"path": _as_str(resolved)})
 
 
 class MermaidHandler:
     def handle(self, ctx: LinkContext, resolved: Any) -> LinkResult:
-        return LinkResult(success=True, action="open_mermaid_viewer", payload={"path": str(resolved)}, message="", error_code=None)
+        return _ok_result("open_mermaid_viewer", {"path": _as_str(resolved)})
 
 
 class TocHandler:
@@ -733,47 +1082,29 @@ class TocHandler:
         """
 
         # 新语义：当 resolved 为 dict 且包含 path/fragment 时，视为“跨文档 TOC 链接”
-        if isinstance(resolved, dict) and ("path" in resolved or "fragment" in resolved):
-            target_path = resolved.get("path")
-            fragment = resolved.get("fragment") or ""
-            # 允许 fragment 中再次包含 #，仅取 # 之后的部分
-            if "#" in fragment:
-                fragment = fragment.split("#", 1)[1]
-            anchor_id = unquote(fragment.lstrip("#"))
-
-            payload: Dict[str, Any] = {}
-            if target_path is not None:
-                payload["path"] = str(target_path)
-            if anchor_id:
-                payload["anchor"] = anchor_id
-
-            return LinkResult(
-                success=True,
-                action="open_markdown_in_tree",
-                payload=payload,
-                message="",
-                error_code=None,
-            )
-
-        # 向后兼容：当无法识别为跨文档链接时，退化为“当前文档内锚点滚动”
-        raw = ctx.href or ""
-        if '#' in raw:
-            fragment = raw.split('#', 1)[1]
-        else:
-            fragment = raw.lstrip('#')
-        anchor_id = unquote(fragment)
-        return LinkResult(
-            success=True,
-            action="scroll_to_anchor",
-            payload={"id": anchor_id},
-            message="",
-            error_code=None,
-        )
+        cross_doc = isinstance(resolved, dict) and ("path" in resolved or "fragment" in resolved)
+        text = (resolved.get("fragment") if cross_doc else ctx.href) or ""
+        # 统一取 # 之后的部分（跨文档时 fragment 中允许再次包含 #）
+        i = text.find("#")
+        fragment = text[i + 1:] if i >= 0 else text
+
+        if not cross_doc:
+            # 向后兼容：当无法识别为跨文档链接时，退化为“当前文档内锚点滚动”
+            return _ok_result("scroll_to_anchor", {"id": _decode_anchor(fragment)})
+
+        anchor_id = _decode_anchor(fragment.lstrip("#"))
+        payload: Dict[str, Any] = {}
+        target_path = resolved.get("path")
+        if target_path is not None:
+            payload["path"] = str(target_path)
+        if anchor_id:
+            payload["anchor"] = anchor_id
+        return _ok_result("open_markdown_in_tree", payload)
 
 
 class FileProtocolHandler:
     def handle(self, ctx: LinkContext, resolved: Any) -> LinkResult:
-        return LinkResult(success=True, action="open_markdown_in_tree", payload={"path": str(resolved)}, message="", error_code=None)
+        return _ok_result("open_markdown_in_tree", {"path": _as_str(resolved)})
 
 
 # --- 文档注释：引用示例（仅供参考，非运行代码） ---
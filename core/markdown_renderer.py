@@ -16,9 +16,14 @@ import os
 import sys
 import logging
 import hashlib
+import html
+import json
+import queue
 import time
+import threading
 from pathlib import Path
 from typing import Dict, Any, Optional, Union, Tuple, List
+from collections import OrderedDict
 from functools import lru_cache
 from datetime import datetime
 import builtins
@@ -38,6 +43,115 @@ except ImportError:
     MARKDOWN_AVAILABLE = False
     logging.warning("无法导入markdown库，将使用基本文本渲染")
 
+# 可选：C实现的cmark-gfm（比python-markdown快一个数量级，需通过 use_fast_parser 开启）
+try:
+    import cmarkgfm
+    from cmarkgfm.cmark import Options as CmarkgfmOptions
+    CMARKGFM_AVAILABLE = True
+except ImportError:
+    CMARKGFM_AVAILABLE = False
+
+
+def _render_with_cmarkgfm(content: str) -> str:
+    """使用cmark-gfm渲染（表格/删除线/自动链接）；保留原始HTML，与python-markdown行为一致"""
+    return cmarkgfm.github_flavored_markdown_to_html(content, options=CmarkgfmOptions.CMARK_OPT_UNSAFE)
+
+
+# 快速渲染函数在导入时确定一次；不可用时为None
+_FAST_RENDER = _render_with_cmarkgfm if CMARKGFM_AVAILABLE else None
+
+# 纯文本降级渲染的静态HTML外壳（样式为常量，避免每次渲染重复格式化）
+_TEXT_HTML_PREFIX = """
+        <div class="text-content">
+            <style>
+                .text-content {
+                    font-family: 'Consolas', 'Monaco', 'Courier New', monospace;
+                    white-space: pre-wrap;
+                    word-wrap: break-word;
+                    line-height: 1.6;
+                    padding: 16px;
+                    background: #f8f9fa;
+                    border: 1px solid #e9ecef;
+                    border-radius: 4px;
+                }
+            </style>
+            """
+_TEXT_HTML_SUFFIX = '\n        </div>\n        '
+
+# 备用库渲染附加的基本样式
+_BASIC_STYLES_PREFIX = """
+        <style>
+            body { font-family: '微软雅黑', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #333; }
+            h1, h2, h3, h4, h5, h6 { margin-top: 24px; margin-bottom: 16px; font-weight: 600; line-height: 1.25; }
+            p { margin-bottom: 16px; }
+            code { background: #f6f8fa; padding: 2px 4px; border-radius: 3px; font-family: 'Consolas', 'Monaco', 'Courier New', monospace; }
+            pre { background: #f6f8fa; padding: 16px; border-radius: 6px; overflow: auto; margin-bottom: 16px; }
+            table { border-collapse: collapse; width: 100%; margin-bottom: 16px; }
+            th, td { border: 1px solid #d0d7de; padding: 8px 12px; text-align: left; }
+            th { background: #f6f8fa; font-weight: 600; }
+            blockquote { border-left: 4px solid #d0d7de; padding-left: 16px; margin: 16px 0; color: #656d76; }
+        </style>
+        """ + "\n"
+
+# 错误结果HTML模板（str.format 占位：error_type / error_message）
+_ERROR_HTML_TEMPLATE = """
+            <div class="error-content">
+                <style>
+                    .error-content {{
+                        padding: 20px;
+                        background: #fff3cd;
+                        border: 1px solid #ffeaa7;
+                        border-radius: 4px;
+                        color: #856404;
+                    }}
+                    .error-title {{
+                        font-weight: bold;
+                        margin-bottom: 10px;
+                    }}
+                </style>
+                <div class="error-title">渲染错误: {error_type}</div>
+                <div>{error_message}</div>
+            </div>
+            """
+
+# 调试落盘队列：失败渲染的 fail.json 由后台线程写入，不阻塞渲染调用方（首次使用时创建）
+_DEBUG_DUMP_QUEUE: Optional[queue.SimpleQueue] = None
+_DEBUG_DUMP_LOCK = threading.Lock()
+
+
+def _debug_dump_worker(dump_queue: queue.SimpleQueue) -> None:
+    """后台线程：逐个写出调试文件，写入失败忽略"""
+    while True:
+        debug_file, payload = dump_queue.get()
+        try:
+            debug_file.parent.mkdir(parents=True, exist_ok=True)
+            with builtins.open(debug_file, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, indent=2)
+        except Exception:
+            pass
+
+
+def _queue_debug_dump(debug_file: Path, payload: Dict[str, Any]) -> None:
+    """提交调试落盘任务；需设置环境变量 LAD_DEBUG_RENDER 开启"""
+    global _DEBUG_DUMP_QUEUE
+    if not os.getenv('LAD_DEBUG_RENDER'):
+        return
+    if _DEBUG_DUMP_QUEUE is None:
+        with _DEBUG_DUMP_LOCK:
+            if _DEBUG_DUMP_QUEUE is None:
+                dump_queue = queue.SimpleQueue()
+                threading.Thread(target=_debug_dump_worker, args=(dump_queue,),
+                                 name='md-render-debug-dump', daemon=True).start()
+                _DEBUG_DUMP_QUEUE = dump_queue
+    _DEBUG_DUMP_QUEUE.put((debug_file, payload))
+
+
+# 进程内热缓存容量（可通过环境变量 MD_RENDER_CACHE 调整，0 表示关闭）
+try:
+    _HOT_RENDER_CACHE_SIZE = max(0, int(os.getenv('MD_RENDER_CACHE', '64')))
+except ValueError:
+    _HOT_RENDER_CACHE_SIZE = 64
+
 try:
     from utils.config_manager import ConfigManager
     from core.file_resolver import FileResolver
@@ -104,9 +218,13 @@ class HybridMarkdownRenderer:
             max_error_history=500
         )
         
-        # 兼容性：保留旧缓存接口
-        self._render_cache = {}
-        self._cache_max_size = 100
+        # 备用markdown库实例：首次使用时构造，后续 reset() 复用，避免每次渲染重新编译扩展正则
+        self._md_instance = None
+        self._md_lock = threading.Lock()
+        
+        # 热缓存：(内容, 选项) -> 渲染结果，位于统一缓存管理器之前
+        self._hot_cache = OrderedDict()
+        self._hot_cache_size = _HOT_RENDER_CACHE_SIZE
         
         # 渲染选项
         self.default_options = {
@@ -116,7 +234,9 @@ class HybridMarkdownRenderer:
             'max_content_length': 5 * 1024 * 1024,  # 5MB
             'cache_enabled': True,
             'fallback_to_text': True,
-            'use_dynamic_import': True  # 新增：控制是否使用动态导入
+            'use_dynamic_import': True,  # 新增：控制是否使用动态导入
+            'use_fast_parser': False,  # 备用渲染优先使用cmark-gfm（不生成标题id/代码高亮，默认关闭）
+            'fast_cache_key': False  # 缓存键使用抽样指纹而非全文哈希（大文档更快，但可能漏检局部修改）
         }
         
         # 根据配置更新选项
@@ -150,7 +270,7 @@ class HybridMarkdownRenderer:
             self.default_options['fallback_to_text'] = markdown_config['fallback_enabled']
         
         # 更新其他设置
-        for key in ['enable_zoom', 'enable_syntax_highlight', 'theme', 'max_content_length']:
+        for key in ['enable_zoom', 'enable_syntax_highlight', 'theme', 'max_content_length', 'use_fast_parser', 'fast_cache_key']:
             if key in markdown_config:
                 self.default_options[key] = markdown_config[key]
     
@@ -203,6 +323,21 @@ class HybridMarkdownRenderer:
             markdown_content: Markdown内容字符串
             options: 渲染选项
             
+        Returns:
+            渲染结果字典
+        """
+        return self._render(markdown_content, options)
+    
+    def _render(self, markdown_content: str, options: Optional[Dict[str, Any]] = None,
+                content_id: Optional[tuple] = None) -> Dict[str, Any]:
+        """
+        render 的实现
+        
+        Args:
+            markdown_content: Markdown内容字符串
+            options: 渲染选项
+            content_id: 内容标识（如文件的路径/修改时间/大小），提供时缓存键由其生成，无需编码哈希全文
+            
         Returns:
             渲染结果字典
         """
@@ -213,35 +348,34 @@ class HybridMarkdownRenderer:
             if markdown_content is None:
                 return self._render_error_result("内容为空", "输入内容不能为None")
             
-            # 合并选项
-            render_options = {**self.default_options, **(options or {})}
-            
-            # 检查内容长度
-            if len(markdown_content) > render_options['max_content_length']:
+            # 检查内容长度（先于选项合并，超长内容直接拒绝）
+            max_content_length = self._max_content_length(options)
+            if len(markdown_content) > max_content_length:
                 return self._render_error_result(
                     "内容过长",
-                    f"内容长度({len(markdown_content)})超过限制({render_options['max_content_length']})"
+                    f"内容长度({len(markdown_content)})超过限制({max_content_length})"
                 )
             
+            # 合并选项
+            render_options = {**self.default_options, **(options or {})}
+            
             # 检查缓存
             if render_options['cache_enabled']:
-                cache_key = self._generate_cache_key(markdown_content, render_options)
+                # 热缓存：直接以(内容, 选项)查找，命中时跳过缓存键哈希与统一缓存管理器的锁/统计开销
+                hot_key = self._hot_cache_key(markdown_content, render_options)
+                if hot_key is not None:
+                    cached_result = self._hot_cache.pop(hot_key, None)
+                    if cached_result is not None:
+                        self._hot_cache[hot_key] = cached_result
+                        return self._cache_hit_result(cached_result, start_time)
+                
+                cache_key = self._generate_cache_key(markdown_content, render_options, content_id)
                 
                 # 使用统一缓存管理器
                 cached_result = self.cache_manager.get(cache_key)
                 if cached_result is not None:
-                    cached_result = cached_result.copy()
-                    cached_result['cached'] = True
-                    cached_result['render_time'] = time.time() - start_time
-                    cached_result['cache_hit'] = True
-                    return cached_result
-                
-                # 兼容性：检查旧缓存
-                if cache_key in self._render_cache:
-                    cached_result = self._render_cache[cache_key].copy()
-                    cached_result['cached'] = True
-                    cached_result['render_time'] = time.time() - start_time
-                    return cached_result
+                    self._remember_hot(hot_key, cached_result)
+                    return self._cache_hit_result(cached_result, start_time)
             
             # 执行渲染
             result = self._render_content(markdown_content, render_options)
@@ -251,9 +385,7 @@ class HybridMarkdownRenderer:
             if render_options['cache_enabled']:
                 # 使用统一缓存管理器
                 self.cache_manager.set(cache_key, result, ttl=3600)  # 1小时过期
-                
-                # 兼容性：同时更新旧缓存
-                self._cache_result(cache_key, result)
+                self._remember_hot(hot_key, result)
             
             return result
             
@@ -273,18 +405,13 @@ class HybridMarkdownRenderer:
             except Exception:
                 pass
 
-            # 调试落盘：记录 fail.json，便于定位“只能跳一次”问题
+            # 调试落盘：记录 fail.json，便于定位“只能跳一次”问题（LAD_DEBUG_RENDER 开启，后台写入）
             try:
-                import json
-                debug_dir = Path(__file__).parent.parent / 'debug_render'
-                debug_dir.mkdir(parents=True, exist_ok=True)
-                debug_file = debug_dir / 'content_render.fail.json'
-                with builtins.open(debug_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        'stage': 'render(content)',
-                        'error': error_result.get('error_info', {}),
-                        'message': str(e)
-                    }, f, ensure_ascii=False, indent=2)
+                _queue_debug_dump(Path(__file__).parent.parent / 'debug_render' / 'content_render.fail.json', {
+                    'stage': 'render(content)',
+                    'error': error_result.get('error_info', {}),
+                    'message': str(e)
+                })
             except Exception:
                 pass
             return error_result
@@ -304,10 +431,12 @@ class HybridMarkdownRenderer:
         
         try:
             # 使用file_resolver统一路径解析
+            # max_size 取本次调用的长度上限：解析器在读取前按 stat 大小拒绝超限文件，无需读取解码
             resolve_options = {
-                'max_size': self.default_options.get('max_content_length', 5 * 1024 * 1024),
+                'max_size': self._max_content_length(options),
                 'read_content': True,  # 渲染需要读取文件内容
-                'detect_encoding': True
+                'detect_encoding': True,
+                'deep_type': False     # 渲染只需内容，跳过MIME/文件头检测
             }
             
             # 解析文件路径
@@ -331,8 +460,13 @@ class HybridMarkdownRenderer:
             file_path = resolve_result['file_path']
             self.invalidation_manager.watch_file(file_path)
             
-            # 渲染内容
-            render_result = self.render(content, options)
+            # 渲染内容：以文件标识（与文件解析缓存的判定一致）生成缓存键，避免对全文重新编码哈希
+            file_info = resolve_result.get('file_info', {})
+            content_id = None
+            if file_info.get('modified_time') is not None and file_info.get('size') is not None:
+                content_id = (file_path, file_info['modified_time'], file_info['size'],
+                              resolve_result.get('encoding', {}).get('encoding'))
+            render_result = self._render(content, options, content_id)
             
             # 合并结果
             result = {
@@ -360,20 +494,15 @@ class HybridMarkdownRenderer:
             except Exception:
                 pass
 
-            # 调试落盘：记录 fail.json（以文件名区分）
+            # 调试落盘：记录 fail.json（以文件名区分；LAD_DEBUG_RENDER 开启，后台写入）
             try:
-                import json
-                debug_dir = Path(__file__).parent.parent / 'debug_render'
-                debug_dir.mkdir(parents=True, exist_ok=True)
                 name = Path(str(file_path)).name if file_path else 'unknown.md'
-                debug_file = debug_dir / f'{name}.fail.json'
-                with builtins.open(debug_file, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        'stage': 'render_file',
-                        'file_path': str(file_path),
-                        'error': error_result.get('error_info', {}),
-                        'message': str(e)
-                    }, f, ensure_ascii=False, indent=2)
+                _queue_debug_dump(Path(__file__).parent.parent / 'debug_render' / f'{name}.fail.json', {
+                    'stage': 'render_file',
+                    'file_path': str(file_path),
+                    'error': error_result.get('error_info', {}),
+                    'message': str(e)
+                })
             except Exception:
                 pass
             return error_result
@@ -435,14 +564,33 @@ class HybridMarkdownRenderer:
                     self.logger.warning(f"  - 路径: {self._import_result_details.get('path', 'unknown')}")
                     self.logger.warning(f"  - 错误码: {self._import_result_details.get('error_code', 'unknown')}")
         
-        # 优先级2: 使用备用markdown库（当fallback或动态导入失败时）
+        fallback_reason = ""
+        if used_fallback:
+            fallback_reason = f"（fallback到{module_name}）"
+        elif not getattr(self, 'markdown_processor_available', False):
+            fallback_reason = "（动态导入失败）"
+
+        # 优先级2: 使用C实现的cmark-gfm（可选依赖，且需开启use_fast_parser）
+        if _FAST_RENDER is not None and options.get('use_fast_parser', False):
+            self._log_render_decision(
+                'cmark_gfm',
+                f'使用cmark-gfm快速渲染{fallback_reason}',
+                {'module': module_name, 'fallback': used_fallback}
+            )
+            try:
+                styled_html = self._add_basic_styles(_FAST_RENDER(content))
+                return {
+                    'success': True,
+                    'html': styled_html,
+                    'renderer': 'cmark_gfm',
+                    'renderer_details': f"cmark-gfm渲染{fallback_reason}",
+                    'options_used': options
+                }
+            except Exception as e:
+                self.logger.warning(f"cmark-gfm渲染失败: {e}")
+
+        # 优先级3: 使用备用markdown库（当fallback或动态导入失败时）
         if self.markdown_available:
-            fallback_reason = ""
-            if used_fallback:
-                fallback_reason = f"（fallback到{module_name}）"
-            elif not getattr(self, 'markdown_processor_available', False):
-                fallback_reason = "（动态导入失败）"
-            
             # 记录渲染决策
             self._log_render_decision(
                 'markdown_library',
@@ -450,13 +598,7 @@ class HybridMarkdownRenderer:
                 {'module': module_name, 'fallback': used_fallback}
             )
             try:
-                md = markdown.Markdown(extensions=[
-                    'markdown.extensions.tables',
-                    'markdown.extensions.fenced_code',
-                    'markdown.extensions.codehilite',
-                    'markdown.extensions.toc'
-                ])
-                html_content = md.convert(content)
+                html_content = self._convert_with_markdown(content)
                 styled_html = self._add_basic_styles(html_content)
                 
                 return {
@@ -469,7 +611,7 @@ class HybridMarkdownRenderer:
             except Exception as e:
                 self.logger.warning(f"备用markdown库渲染失败: {e}")
         
-        # 优先级3: 降级到纯文本
+        # 优先级4: 降级到纯文本
         if options.get('fallback_to_text', True):
             # 记录渲染决策
             self._log_render_decision(
@@ -489,6 +631,29 @@ class HybridMarkdownRenderer:
         self.logger.error(error_msg)
         raise Exception(error_msg)
     
+    def _convert_with_markdown(self, content: str) -> str:
+        """
+        使用复用的markdown.Markdown实例转换内容（实例非线程安全，加锁串行）
+        
+        Args:
+            content: Markdown内容
+            
+        Returns:
+            HTML内容
+        """
+        with self._md_lock:
+            md = self._md_instance
+            if md is None:
+                md = self._md_instance = markdown.Markdown(extensions=[
+                    'markdown.extensions.tables',
+                    'markdown.extensions.fenced_code',
+                    'markdown.extensions.codehilite',
+                    'markdown.extensions.toc'
+                ])
+            else:
+                md.reset()
+            return md.convert(content)
+    
     def _render_as_text(self, content: str, options: Dict[str, Any]) -> Dict[str, Any]:
         """
         将内容渲染为纯文本HTML
@@ -500,30 +665,10 @@ class HybridMarkdownRenderer:
         Returns:
             渲染结果
         """
-        # 转义HTML字符
-        import html
-        escaped_content = html.escape(content)
+        # 转义HTML字符并将换行符转换为<br>标签；链式调用使转义中间串在替换后立即释放，降低峰值内存
+        formatted_content = html.escape(content).replace('\n', '<br>')
         
-        # 将换行符转换为<br>标签
-        formatted_content = escaped_content.replace('\n', '<br>')
-        
-        html_content = f"""
-        <div class="text-content">
-            <style>
-                .text-content {{
-                    font-family: 'Consolas', 'Monaco', 'Courier New', monospace;
-                    white-space: pre-wrap;
-                    word-wrap: break-word;
-                    line-height: 1.6;
-                    padding: 16px;
-                    background: #f8f9fa;
-                    border: 1px solid #e9ecef;
-                    border-radius: 4px;
-                }}
-            </style>
-            {formatted_content}
-        </div>
-        """
+        html_content = ''.join((_TEXT_HTML_PREFIX, formatted_content, _TEXT_HTML_SUFFIX))
         
         return {
             'success': True,
@@ -610,51 +755,98 @@ class HybridMarkdownRenderer:
         Returns:
             带样式的HTML内容
         """
-        styles = """
-        <style>
-            body { font-family: '微软雅黑', 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; color: #333; }
-            h1, h2, h3, h4, h5, h6 { margin-top: 24px; margin-bottom: 16px; font-weight: 600; line-height: 1.25; }
-            p { margin-bottom: 16px; }
-            code { background: #f6f8fa; padding: 2px 4px; border-radius: 3px; font-family: 'Consolas', 'Monaco', 'Courier New', monospace; }
-            pre { background: #f6f8fa; padding: 16px; border-radius: 6px; overflow: auto; margin-bottom: 16px; }
-            table { border-collapse: collapse; width: 100%; margin-bottom: 16px; }
-            th, td { border: 1px solid #d0d7de; padding: 8px 12px; text-align: left; }
-            th { background: #f6f8fa; font-weight: 600; }
-            blockquote { border-left: 4px solid #d0d7de; padding-left: 16px; margin: 16px 0; color: #656d76; }
-        </style>
-        """
-        
-        return f"{styles}\n{html_content}"
+        return _BASIC_STYLES_PREFIX + html_content
     
-    def _generate_cache_key(self, content: str, options: Dict[str, Any]) -> str:
+    def _generate_cache_key(self, content: str, options: Dict[str, Any],
+                            content_id: Optional[tuple] = None) -> str:
         """
         生成缓存键
         
         Args:
             content: 内容
             options: 选项
+            content_id: 内容标识（如文件的路径/修改时间/大小），提供时代替内容参与哈希
             
         Returns:
             缓存键
         """
-        # 创建包含内容和选项的字符串
-        cache_string = f"{content}:{str(sorted(options.items()))}"
-        return hashlib.md5(cache_string.encode('utf-8')).hexdigest()
+        if content_id is not None:
+            hasher = hashlib.blake2b(repr(('file',) + content_id).encode('utf-8'), digest_size=16)
+        elif options.get('fast_cache_key', False):
+            # 抽样指纹：长度 + 头/中/尾各256字符，O(1)；长度不变的中间局部修改可能命中旧缓存，故默认关闭
+            n = len(content)
+            mid = n // 2
+            sample = (n, content[:256], content[mid:mid + 256], content[-256:])
+            hasher = hashlib.blake2b(repr(sample).encode('utf-8'), digest_size=16)
+        else:
+            # 内容与选项分段增量哈希，避免拼接出内容大小的中间字符串；blake2b 比 md5 更快
+            hasher = hashlib.blake2b(content.encode('utf-8'), digest_size=16)
+        hasher.update(b':')
+        hasher.update(str(sorted(options.items())).encode('utf-8'))
+        return hasher.hexdigest()
     
-    def _cache_result(self, cache_key: str, result: Dict[str, Any]):
+    def _max_content_length(self, options: Optional[Dict[str, Any]]) -> int:
         """
-        缓存渲染结果
+        获取本次渲染的内容长度上限（调用选项优先于默认选项）
         
         Args:
-            cache_key: 缓存键
-            result: 渲染结果
+            options: 渲染选项
+            
+        Returns:
+            长度上限
+        """
+        if options and 'max_content_length' in options:
+            return options['max_content_length']
+        return self.default_options.get('max_content_length', 5 * 1024 * 1024)
+    
+    @staticmethod
+    def _cache_hit_result(cached_result: Dict[str, Any], start_time: float) -> Dict[str, Any]:
+        """
+        由缓存条目构造命中结果：一次性合并出新字典（html 等大字段共享引用），不修改缓存中的条目
+        
+        Args:
+            cached_result: 缓存中的渲染结果
+            start_time: 本次渲染开始时间
+            
+        Returns:
+            命中结果字典
+        """
+        return {**cached_result, 'cached': True, 'render_time': time.time() - start_time, 'cache_hit': True}
+    
+    @staticmethod
+    def _hot_cache_key(content: str, options: Dict[str, Any]) -> Optional[Tuple[str, tuple]]:
+        """
+        生成热缓存键（内容字符串的哈希值由解释器缓存，重复渲染同一内容时无需重新计算）
+        
+        Args:
+            content: 内容
+            options: 选项
+            
+        Returns:
+            (内容, 选项元组)；选项中含不可哈希的值时返回None（不使用热缓存）
         """
-        if len(self._render_cache) >= self._cache_max_size:
-            # 移除最旧的缓存项
-            oldest_key = next(iter(self._render_cache))
-            del self._render_cache[oldest_key]
+        options_key = tuple(sorted(options.items()))
+        try:
+            hash(options_key)
+        except TypeError:
+            return None
+        return (content, options_key)
+    
+    def _remember_hot(self, hot_key: Optional[Tuple[str, tuple]], result: Dict[str, Any]):
+        """
+        写入热缓存，超出容量时淘汰最久未使用的项
         
-        self._render_cache[cache_key] = result.copy()
+        Args:
+            hot_key: 热缓存键
+            result: 渲染结果
+        """
+        if hot_key is None or self._hot_cache_size <= 0:
+            return
+        hot_cache = self._hot_cache
+        hot_cache.pop(hot_key, None)
+        hot_cache[hot_key] = result
+        while len(hot_cache) > self._hot_cache_size:
+            hot_cache.popitem(last=False)
     
     def _render_error_result(self, error_type: str, error_message: str) -> Dict[str, Any]:
         """
@@ -671,25 +863,7 @@ class HybridMarkdownRenderer:
             'success': False,
             'error_type': error_type,
             'error_message': error_message,
-            'html': f"""
-            <div class="error-content">
-                <style>
-                    .error-content {{
-                        padding: 20px;
-                        background: #fff3cd;
-                        border: 1px solid #ffeaa7;
-                        border-radius: 4px;
-                        color: #856404;
-                    }}
-                    .error-title {{
-                        font-weight: bold;
-                        margin-bottom: 10px;
-                    }}
-                </style>
-                <div class="error-title">渲染错误: {error_type}</div>
-                <div>{error_message}</div>
-            </div>
-            """,
+            'html': _ERROR_HTML_TEMPLATE.format(error_type=error_type, error_message=error_message),
             'renderer': 'error_handler'
         }
     
@@ -701,8 +875,8 @@ class HybridMarkdownRenderer:
         # 清空失效历史
         self.invalidation_manager.invalidation_history.clear()
         
-        # 兼容性：清空旧缓存
-        self._render_cache.clear()
+        # 清空热缓存
+        self._hot_cache.clear()
         self.logger.info("渲染缓存已清空")
     
     def get_cache_info(self) -> Dict[str, Any]:
@@ -728,7 +902,8 @@ class HybridMarkdownRenderer:
             'eviction_count': unified_stats.eviction_count,
             'memory_usage_mb': unified_stats.memory_usage,
             'strategy': self.cache_manager.strategy.value,
-            'legacy_cache_size': len(self._render_cache),  # 旧缓存大小
+            'legacy_cache_size': 0,  # 旧缓存已移除，字段保留兼容
+            'hot_cache_size': len(self._hot_cache),
             'invalidation_stats': invalidation_stats,
             'watched_files': len(self.invalidation_manager.file_watchers),
             'error_stats': error_stats.to_dict()
@@ -754,6 +929,7 @@ class HybridMarkdownRenderer:
         return {
             'markdown_processor': getattr(self, 'markdown_processor_available', False),
             'markdown_library': self.markdown_available,
+            'fast_parser': CMARKGFM_AVAILABLE,
             'syntax_highlight': self.markdown_available,
             'text_fallback': True,
             'unified_path_resolution': True,
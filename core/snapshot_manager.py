@@ -18,7 +18,7 @@ import threading
 from copy import deepcopy
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from utils.config_manager import ConfigManager
 from core.correlation_id_manager import CorrelationIdManager
@@ -181,6 +181,17 @@ class SnapshotManager:
             self._record_metric("snapshot.link_saved")
         return True
 
+    def save_link_snapshots(self, items: List[Dict[str, Any]]) -> bool:
+        """批量保存链接快照：链接快照只保留最新一条，故仅规范化并落盘最后一条，计数按条累加。"""
+        if not items:
+            return True
+        normalized = self._normalize_link_snapshot(items[-1])
+        with self._lock:
+            self._link_snapshot = normalized
+            self._persist_cache(self._LINK_CACHE_KEY, normalized)
+            self._record_metric("snapshot.link_saved", len(items))
+        return True
+
     def get_link_snapshot(self) -> Dict[str, Any]:
         with self._lock:
             snapshot = self._link_snapshot or deepcopy(LINK_SNAPSHOT_FIELDS)
@@ -276,9 +287,9 @@ class SnapshotManager:
     def _module_cache_key(self, module_name: str) -> str:
         return f"{self._MODULE_CACHE_PREFIX}{module_name}"
 
-    def _record_metric(self, name: str) -> None:
+    def _record_metric(self, name: str, value: int = 1) -> None:
         try:
-            self.performance_metrics.increment_counter(name)
+            self.performance_metrics.increment_counter(name, value)
         except Exception:
             pass
 
@@ -152,7 +152,7 @@ class ErrorRecord:
                 'module': getattr(error_info.context, 'module', None) if hasattr(error_info, 'context') and error_info.context else None,
                 'function': getattr(error_info.context, 'function', None) if hasattr(error_info, 'context') and error_info.context else None,
                 'line_number': getattr(error_info.context, 'line_number', None) if hasattr(error_info, 'context') and error_info.context else None,
-                'stack_trace': getattr(error_info.context, 'stack_trace', None) if hasattr(error_info, 'context') and error_info.context else None,
+                'stack_trace': (error_info.context.format_stack_trace() if hasattr(error_info.context, 'format_stack_trace') else getattr(error_info.context, 'stack_trace', None)) if hasattr(error_info, 'context') and error_info.context else None,
             } if hasattr(error_info, 'context') and error_info.context else None,
             user_context=getattr(error_info.context, 'user_context', None) if hasattr(error_info, 'context') and error_info.context else None,
             system_context=getattr(error_info.context, 'system_context', None) if hasattr(error_info, 'context') and error_info.context else None,
@@ -282,6 +282,21 @@ def test_dynamic_module_importer_cache():
     print("✅ 动态模块导入器缓存测试完成")
 
 
+def test_import_status_error_stats_isolated():
+    """测试导入状态中的错误统计为副本，且错误率每次重新计算"""
+    importer = DynamicModuleImporter()
+    importer.error_handler.handle_error(ValueError("status test"))
+
+    status = importer.get_import_status()
+    status['error_stats']['total_errors'] = -1
+    status['error_stats']['errors_by_severity'].clear()
+
+    again = importer.get_import_status()['error_stats']
+    assert again['total_errors'] == 1
+    assert sum(again['errors_by_severity'].values()) == 1
+    assert again['error_rate_per_hour'] == importer.error_handler.error_stats.error_rate_per_hour
+
+
 def test_cache_performance():
     """测试缓存性能"""
     print("\n" + "="*50)
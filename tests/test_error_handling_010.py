@@ -174,6 +174,26 @@ class TestEnhancedErrorHandler:
             except ValueError as e:
                 handler.handle_error(e, {"test": "context"})
 
+    def test_strict_mode_keeps_stats_consistent(self):
+        """测试strict模式抛出异常前仍完整记录统计"""
+        config_manager = Mock()
+        config_manager._app_config = {
+            'error_handling': {'strategy': 'strict'}
+        }
+        config_manager.get_unified_config.return_value = {'strategy': 'strict'}
+
+        handler = EnhancedErrorHandler(config_manager=config_manager)
+
+        with pytest.raises(ValueError):
+            handler.handle_error(ValueError("strict error"))
+
+        stats = handler.get_error_stats()
+        assert stats.total_errors == 1
+        assert stats.unresolved_errors == 1
+        assert sum(stats.errors_by_severity.values()) == 1
+        assert sum(stats.errors_by_category.values()) == 1
+        assert len(handler.error_history) == 1
+
     def test_error_categorization(self):
         """测试错误分类"""
         handler = EnhancedErrorHandler()
@@ -203,6 +223,65 @@ class TestEnhancedErrorHandler:
         # 测试配置错误严重程度
         assert handler._determine_severity(ErrorCategory.CONFIGURATION, ValueError("test")) == ErrorSeverity.MEDIUM
 
+    def test_history_eviction_keeps_stats_consistent(self):
+        """测试历史记录淘汰时统计计数与平均解决时间同步更新"""
+        handler = EnhancedErrorHandler(max_error_history=2)
+
+        for i in range(2):
+            handler.handle_error(ValueError(f"error {i}"))
+        handler._mark_error_resolved(handler.error_history[0], "降级处理")
+        stats = handler.get_error_stats()
+        assert stats.resolved_errors == 1
+        assert stats.average_resolution_time >= 0.0
+
+        # 第三个错误淘汰已解决的第一个错误
+        handler.handle_error(ValueError("error 2"))
+        stats = handler.get_error_stats()
+        assert stats.total_errors == 3
+        assert stats.resolved_errors == 0
+        assert stats.unresolved_errors == 2
+        assert stats.average_resolution_time == 0.0
+
+    def test_error_history_record_keeps_stack_trace(self):
+        """测试经处理器记录的异常转换为错误历史记录后保留堆栈文本"""
+        from dataclasses import asdict
+        from error_history.core.models import ErrorRecord
+
+        handler = EnhancedErrorHandler()
+
+        def failing():
+            raise ValueError("stack test")
+
+        try:
+            failing()
+        except ValueError as e:
+            error_info = handler.handle_error(e)
+
+        assert error_info.context.format_stack_trace()
+        assert error_info.context.stack_trace
+        assert 'stack_trace' in asdict(error_info.context)
+        record = ErrorRecord.from_error_info(error_info)
+        assert record.context['stack_trace']
+        assert 'failing' in record.context['stack_trace']
+
+    def test_shutdown_saves_report_when_worker_stuck(self):
+        """测试处理线程未在超时内退出时关闭仍同步保存错误报告"""
+        import threading
+
+        handler = EnhancedErrorHandler()
+        handler.SHUTDOWN_JOIN_TIMEOUT = 0.05
+        release = threading.Event()
+        stuck = threading.Thread(target=release.wait, daemon=True)
+        stuck.start()
+        handler._processing_thread = stuck
+
+        try:
+            with patch.object(handler, 'save_error_report') as save:
+                handler.shutdown()
+            save.assert_called_once()
+        finally:
+            release.set()
+
 
 class TestErrorRecoveryMechanisms:
     """测试错误恢复机制"""
@@ -196,6 +196,33 @@ class TestFileResolver(unittest.TestCase):
         self.assertGreaterEqual(encoding['confidence'], 0.0)
         self.assertLessEqual(encoding['confidence'], 1.0)
     
+    def test_resolve_many(self):
+        """测试批量解析"""
+        missing = self.test_dir / "missing.md"
+        paths = [self.md_file, self.txt_file, self.gbk_file, missing]
+        results = self.resolver.resolve_many(paths)
+
+        self.assertEqual(len(results), 4)
+        for path in paths[:3]:
+            result = results[str(path)]
+            self.assertTrue(result['success'])
+            single = self.resolver.resolve_file_path(path)
+            # resolved_at 在每次解析（含缓存命中）时重新生成，不参与比较
+            self.assertEqual({k: v for k, v in result.items() if k != 'resolved_at'},
+                             {k: v for k, v in single.items() if k != 'resolved_at'})
+        self.assertFalse(results[str(missing)]['success'])
+        self.assertEqual(results[str(missing)]['error_type'], 'FILE_NOT_FOUND')
+
+    def test_encoding_fast_path(self):
+        """测试BOM/ASCII/UTF-8快速编码判定"""
+        sniff = FileResolver._sniff_encoding
+        self.assertEqual(sniff(b'\xef\xbb\xbf# title', True)['method'], 'bom')
+        self.assertEqual(sniff('# 标题'.encode('utf-16'), True)['encoding'], 'utf-16')
+        self.assertEqual(sniff(b'plain ascii', True)['method'], 'ascii')
+        # 采样末尾截断的多字节字符不影响UTF-8判定
+        self.assertEqual(sniff('中文'.encode('utf-8')[:-1], False)['encoding'], 'utf-8')
+        self.assertIsNone(sniff('这是GBK'.encode('gbk'), True))
+
     def test_get_supported_extensions(self):
         """测试获取支持的扩展名"""
         extensions = self.resolver.get_supported_extensions()
@@ -248,6 +275,44 @@ class TestFileResolver(unittest.TestCase):
         result = self.resolver.resolve_file_path(large_file)
         self.assertTrue(result['success'])
     
+    def test_resolve_cache(self):
+        """测试解析结果缓存及文件修改后失效"""
+        first = self.resolver.resolve_file_path(self.txt_file)
+        second = self.resolver.resolve_file_path(self.txt_file)
+        self.assertEqual(first['file_info'], second['file_info'])
+        self.assertEqual(len(self.resolver._cache), 1)
+
+        # 修改返回结果不应影响缓存
+        second['file_info']['size'] = -1
+        self.assertNotEqual(self.resolver.resolve_file_path(self.txt_file)['file_info']['size'], -1)
+
+        # 文件内容变化后重新解析
+        with open(self.txt_file, 'a', encoding='utf-8') as f:
+            f.write(" More content.")
+        third = self.resolver.resolve_file_path(self.txt_file)
+        self.assertGreater(third['file_info']['size'], first['file_info']['size'])
+
+        # 关闭缓存时不写入缓存
+        self.resolver.clear_cache()
+        self.resolver.resolve_file_path(self.txt_file, {'cache_enabled': False})
+        self.assertEqual(len(self.resolver._cache), 0)
+
+    def test_resolve_cache_hit_isolation(self):
+        """测试缓存命中时重新生成解析时间，且嵌套结构的修改不污染缓存"""
+        first = self.resolver.resolve_file_path(self.md_file)
+        first['file_type']['extension_type']['name'] = 'bogus'
+        with patch.object(self.resolver, '_get_timestamp', return_value='RESTAMPED'):
+            second = self.resolver.resolve_file_path(self.md_file)
+        self.assertEqual(second['resolved_at'], 'RESTAMPED')
+        self.assertEqual(second['file_type']['extension_type']['name'], 'markdown_files')
+
+    def test_resolve_cache_tracks_file_types_config(self):
+        """测试文件类型配置变化后，未修改文件的缓存结果失效"""
+        self.resolver.resolve_file_path(self.md_file)
+        with patch.object(self.resolver, '_file_types_config_stamp', return_value=-1):
+            self.resolver.resolve_file_path(self.md_file)
+        self.assertEqual(len(self.resolver._cache), 2)
+
     @patch('core.file_resolver.CHARDET_AVAILABLE', False)
     def test_encoding_detection_without_chardet(self):
         """测试没有chardet库时的编码检测"""
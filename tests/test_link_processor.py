@@ -132,6 +132,18 @@ def test_pathresolver_relative_normalize():
     assert ".." not in str(out)
 
 
+def test_pathresolver_relative_current_file_follows_cwd(tmp_path, monkeypatch):
+    pr = PathResolver()
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    monkeypatch.chdir(tmp_path / "a")
+    first = pr.resolve_relative(Path("docs/guide.md"), "pic.png")
+    monkeypatch.chdir(tmp_path / "b")
+    second = pr.resolve_relative(Path("docs/guide.md"), "pic.png")
+    assert first != second
+    assert second == Path(os.path.abspath("docs/pic.png"))
+
+
 def test_pathresolver_file_protocol():
     pr = PathResolver()
     out = pr.resolve_file_protocol("file:///C:/data/a.md")
@@ -230,6 +242,42 @@ def test_validator_max_depth(tmp_path):
     assert res.error_code.name == "SECURITY_BLOCKED"
 
 
+def test_validator_follows_in_place_policy_edits():
+    v = LinkValidator()
+    policy = {"security": {"allowed_protocols": ["https"], "allowed_domains": ["example.com"]}}
+    assert v.validate("https://example.com/page", policy).ok is True
+
+    # 原地修改同一个策略字典：收紧白名单后应立即生效
+    policy["security"]["allowed_domains"].remove("example.com")
+    res = v.validate("https://example.com/page", policy)
+    assert res.ok is False
+    assert res.error_code == ErrorCode.SECURITY_BLOCKED
+
+
+def test_validator_path_rule_cache_follows_policy_edits(tmp_path):
+    v = LinkValidator()
+    p = tmp_path / "secret" / "c.md"
+    policy = {"check_exists": False, "security": {"forbidden_patterns": []}}
+    assert v.validate(p, policy).ok is True
+
+    # 路径的词法结果已缓存；原地追加禁止模式后同一路径须重新判定
+    policy["security"]["forbidden_patterns"].append("secret")
+    res = v.validate(p, policy)
+    assert res.ok is False
+    assert res.error_code == ErrorCode.SECURITY_BLOCKED
+
+
+def test_link_policy_detached_from_source_dict():
+    from core.link_processor import LinkPolicy
+
+    security = {"forbidden_patterns": ["~"]}
+    policy = LinkPolicy.from_dict({"security": security})
+    security["forbidden_patterns"].append("secret")
+    assert tuple(policy.security["forbidden_patterns"]) == ("~",)
+    with pytest.raises(TypeError):
+        policy.security["forbidden_patterns"] = ()
+
+
 def test_logging_with_session_id(caplog):
     import logging
     logger = logging.getLogger("lp-json")
@@ -504,3 +552,60 @@ def test_snapshot_records_for_route_actions():
         for rec in snap.records
     )
     assert ok and blocked
+
+
+def test_recognizer_cache_keyed_by_mermaid_flag():
+    from core.link_processor import LinkTypeRecognizer
+    r = LinkTypeRecognizer(cache_size=2)
+    assert r.recognize("graph", LinkContext(href="graph")) == LinkType.UNKNOWN
+    assert r.recognize("graph", LinkContext(href="graph", extra={"mermaid_container": True})) == LinkType.MERMAID
+    assert r.recognize("graph", LinkContext(href="graph")) == LinkType.UNKNOWN
+    r.recognize("a.md", LinkContext(href="a.md"))
+    assert len(r._cache) == 2
+
+
+def test_snapshot_batching_flushes_in_batches():
+    class BatchSnapStub:
+        def __init__(self):
+            self.batches = []
+        def save_link_snapshot(self, data):
+            self.batches.append([data])
+        def save_link_snapshots(self, items):
+            self.batches.append(list(items))
+    snap = BatchSnapStub()
+    p = LinkProcessor(logger=logging.getLogger("lp-snap-batch"), snapshot_manager=snap)
+    p.set_handlers({LinkType.ANCHOR: AnchorHandler()})
+    p.set_policy({"check_exists": False, "snapshot_batch_size": 3})
+    for i in range(4):
+        p.process_link(LinkContext(href=f"#a{i}"))
+    assert [len(b) for b in snap.batches] == [3]
+    p.close()
+    assert [len(b) for b in snap.batches] == [3, 1]
+    assert snap.batches[1][0]["details"]["href"] == "#a3"
+
+
+def test_process_links_matches_single_calls(lp):
+    hrefs = ["https://example.com", "#intro", "docs/a.md", "img/p.png", "unknown://x"]
+    ctxs = [LinkContext(href=h, current_file=Path("D:/repo/root.md")) for h in hrefs]
+    batch = lp.process_links(ctxs)
+    single = [lp.process_link(c) for c in ctxs]
+    assert [(r.success, r.action, r.payload, r.error_code) for r in batch] == \
+        [(r.success, r.action, r.payload, r.error_code) for r in single]
+
+
+def test_read_pyproject_version_method(tmp_path):
+    f = tmp_path / "pyproject.toml"
+    f.write_text('[project]\nname = "p"\nversion = "1.2.3"\n\n[tool.poetry]\nversion = "2.3.4"\n', encoding="utf-8")
+    assert LinkProcessor._read_pyproject_version(f) == "1.2.3"
+    f.write_text('[tool.poetry]\nname = "p"\nversion = "3.4.5"\n', encoding="utf-8")
+    assert LinkProcessor._read_pyproject_version(f) == "3.4.5"
+    f.write_text("invalid toml content", encoding="utf-8")
+    assert LinkProcessor._read_pyproject_version(f) is None
+
+
+def test_read_pyproject_version_reparses_on_change(tmp_path):
+    f = tmp_path / "pyproject.toml"
+    f.write_text('[project]\nversion = "1.0.0"\n', encoding="utf-8")
+    assert LinkProcessor._read_pyproject_version(f) == "1.0.0"
+    f.write_text('[project]\nversion = "1.0.10"\n', encoding="utf-8")
+    assert LinkProcessor._read_pyproject_version(f) == "1.0.10"
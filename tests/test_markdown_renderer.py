@@ -194,6 +194,21 @@ def hello_world():
         cache_info_after = self.renderer.get_cache_info()
         self.assertEqual(cache_info_after['cache_size'], 0)
     
+    def test_hot_cache_skips_cache_manager(self):
+        """测试热缓存命中时不再查询统一缓存管理器"""
+        result1 = self.renderer.render(self.simple_markdown)
+        self.assertTrue(result1['success'])
+        
+        with patch.object(self.renderer.cache_manager, 'get') as mock_get:
+            result2 = self.renderer.render(self.simple_markdown)
+            mock_get.assert_not_called()
+        self.assertTrue(result2['cache_hit'])
+        self.assertEqual(result2['html'], result1['html'])
+        
+        # 清空缓存后热缓存同步清空
+        self.renderer.clear_cache()
+        self.assertEqual(self.renderer.get_cache_info()['hot_cache_size'], 0)
+    
     def test_cache_with_different_options(self):
         """测试不同选项的缓存"""
         # 使用不同选项渲染相同内容
@@ -322,6 +337,20 @@ def hello_world():
         self.assertEqual(result['renderer'], 'text_fallback')
         self.assertIn('text-content', result['html'])
 
+    def test_render_with_fast_parser(self):
+        """测试开启use_fast_parser时优先使用cmark-gfm快速渲染"""
+        self.renderer.markdown_processor_available = False
+        fake_render = MagicMock(return_value="<h1>fast</h1>")
+        with patch('core.markdown_renderer._FAST_RENDER', fake_render):
+            result = self.renderer._render_content(self.simple_markdown, {'use_fast_parser': True})
+            self.assertEqual(result['renderer'], 'cmark_gfm')
+            self.assertIn('<h1>fast</h1>', result['html'])
+
+            # 未开启时仍走python-markdown
+            result = self.renderer._render_content(self.simple_markdown, {})
+            self.assertEqual(result['renderer'], 'markdown_library')
+        fake_render.assert_called_once_with(self.simple_markdown)
+
 
 class TestMarkdownRendererIntegration(unittest.TestCase):
     """Markdown渲染器集成测试类"""
@@ -1679,6 +1679,10 @@ class ContentViewer(QWidget):
     def closeEvent(self, event):
         """关闭事件处理，确保清理WebEngine资源"""
         try:
+            # 提交链接处理器中尚未落盘的快照
+            link_processor = getattr(self, "link_processor", None)
+            if link_processor is not None:
+                link_processor.close()
             self._cleanup_old_page()
             if self.web_engine_view:
                 # 断开所有信号连接